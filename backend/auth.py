@@ -1,10 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+from cache import TTLCache
+import asyncio
+import hashlib
 import os
+import threading
+import time
 
 # JWT settings
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "your-secret-key-change-in-production")
@@ -14,6 +21,15 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt runs in a small thread pool (it releases the GIL) so a login burst
+# cannot block the event loop. Requests beyond the queue limit get a 503.
+HASH_WORKERS = int(os.environ.get("BCRYPT_WORKERS", "2"))
+HASH_MAX_PENDING = int(os.environ.get("BCRYPT_MAX_PENDING", "32"))
+
+# Tokens that already passed signature verification, keyed by their SHA-256.
+# Each entry expires with the token itself.
+token_cache = TTLCache(maxsize=int(os.environ.get("TOKEN_CACHE_SIZE", "1024")))
+
 # Bearer token security
 security = HTTPBearer()
 
@@ -28,6 +44,79 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasher:
+    """Runs password hashing in a bounded thread pool and keeps queue metrics."""
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        # Guards the counters updated from worker threads
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.run_seconds_total = 0.0
+
+    async def _run(self, func: Callable, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                self.running += 1
+                self.wait_seconds_total += started - submitted
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.run_seconds_total += time.perf_counter() - started
+
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, task)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against a hash without blocking the event loop."""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        """Hash a password without blocking the event loop."""
+        return await self._run(get_password_hash, password)
+
+    def stats(self) -> dict:
+        """Snapshot of the queue and timing counters."""
+        return {
+            "workers": self.max_workers,
+            "pending": self.pending,
+            "running": self.running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_seconds_total": self.wait_seconds_total,
+            "run_seconds_total": self.run_seconds_total,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(HASH_WORKERS, HASH_MAX_PENDING)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -56,6 +145,13 @@ def decode_access_token(token: str) -> dict:
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """Get the current authenticated user from token."""
     token = credentials.credentials
+    key = ("token", hashlib.sha256(token.encode()).digest())
+    user = token_cache.get(key)
+    if user is not None:
+        token_cache.hits += 1
+        return dict(user)
+    token_cache.misses += 1
+
     payload = decode_access_token(token)
     user_id = payload.get("sub")
     if user_id is None:
@@ -64,4 +160,10 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return {"id": user_id, "email": payload.get("email")}
\ No newline at end of file
+    user = {"id": user_id, "email": payload.get("email")}
+
+    # Tokens without an exp claim are verified on every request
+    expires_in = payload["exp"] - time.time() if "exp" in payload else 0
+    if expires_in > 0:
+        token_cache.set(key, user, ttl=expires_in)
+    return dict(user)
\ No newline at end of file
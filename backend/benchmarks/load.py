@@ -0,0 +1,440 @@
+"""Load test for the API against a local MongoDB or an in-memory stand-in.
+
+Seeds synthetic content at the requested scale, then drives the public and
+admin request/response routes in-process with concurrent clients and reports
+throughput and latency percentiles per route. The /api/stream feed holds its
+connection open for minutes and is not driven. Results are written as JSON,
+tagged with the current commit, so runs can be compared:
+
+    python benchmarks/load.py --mock --news 100000 --gallery 100000
+    python benchmarks/load.py --mock --compare benchmarks/results/<earlier>.json
+
+Without ``--mock`` the MongoDB at MONGO_URL is used. The database given by
+``--db`` (default ``load_test``) is dropped before seeding, so only names
+starting with ``load_test`` are accepted; DB_NAME from the environment is
+ignored.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import seed_data
+from sync import encode_sync_token
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+ADMIN_EMAIL = "loadtest@example.com"
+ADMIN_PASSWORD = "load-test-password"
+
+# The database is dropped before seeding, so its name has to say it is disposable
+DB_PREFIX = "load_test"
+
+INSERT_BATCH = 1000
+
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    # Called with the run state and the request number; returns path and kwargs,
+    # or None once there is nothing left to request
+    build: Callable[[dict, int], Optional[tuple]]
+    admin: bool = False
+    # Kind of document, created by an earlier scenario, that this one works through
+    needs: Optional[str] = None
+    # Uses queries the in-memory stand-in cannot run, e.g. $text search
+    needs_mongod: bool = False
+
+
+def get(path: str) -> Callable[[dict, int], tuple]:
+    return lambda state, i: (path.format(**state), {})
+
+
+def _news(i: int, now: datetime) -> dict:
+    return {
+        "title": f"Load test article {i}",
+        "date": (now - timedelta(hours=i)).strftime("%Y-%m-%d"),
+        "excerpt": "A short summary of the article shown on the news list. " * 2,
+        "content": "Body text of the article, repeated to a realistic length. " * 40,
+        "image": f"https://example.org/uploads/{i:032x}.jpg",
+        "created_at": now - timedelta(hours=i),
+        "updated_at": now - timedelta(hours=i),
+    }
+
+
+def _gallery(i: int, now: datetime) -> dict:
+    return {
+        "url": f"https://example.org/uploads/{i:032x}.jpg",
+        "caption": f"Gallery photo {i}",
+        "created_at": now - timedelta(minutes=i),
+    }
+
+
+def _past_event(i: int, now: datetime) -> dict:
+    return {
+        "title": f"Past event {i}",
+        "date": (now - timedelta(days=i)).strftime("%Y-%m-%d"),
+        "description": "What happened at the event. " * 20,
+        "images": [f"https://example.org/uploads/{i:032x}.jpg"],
+        "created_at": now - timedelta(days=i),
+        "updated_at": now - timedelta(days=i),
+    }
+
+
+async def insert_generated(collection, count: int, factory) -> None:
+    now = datetime.utcnow()
+    for start in range(0, count, INSERT_BATCH):
+        batch = [factory(i, now) for i in range(start, min(start + INSERT_BATCH, count))]
+        await collection.insert_many(batch)
+
+
+async def seed(db, args) -> None:
+    """Load the seed content, then top collections up to the requested sizes."""
+    now = datetime.utcnow()
+    for name, docs in (
+        ("board_members", seed_data.BOARD_MEMBERS_SEED),
+        ("past_events", seed_data.PAST_EVENTS_SEED),
+        ("upcoming_events", seed_data.UPCOMING_EVENTS_SEED),
+        ("news", seed_data.NEWS_ARTICLES_SEED),
+        ("gallery", seed_data.GALLERY_IMAGES_SEED),
+    ):
+        stamped = [{**doc, "created_at": now, "updated_at": now} for doc in docs]
+        await db[name].insert_many(stamped)
+
+    await insert_generated(db.news, max(0, args.news - len(seed_data.NEWS_ARTICLES_SEED)), _news)
+    await insert_generated(db.gallery, max(0, args.gallery - len(seed_data.GALLERY_IMAGES_SEED)), _gallery)
+    await insert_generated(
+        db.past_events, max(0, args.past_events - len(seed_data.PAST_EVENTS_SEED)), _past_event
+    )
+
+
+def _png() -> bytes:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (1600, 1200), (31, 93, 170)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def scenarios() -> List[Scenario]:
+    def create(path: str, body: Callable[[int], dict]):
+        return Scenario(f"POST {path}", "POST", lambda s, i: (path, {"json": body(i)}), admin=True)
+
+    def update(kind: str, path: str, body: Callable[[int], dict]):
+        def build(state, i):
+            ids = state["created"].get(kind)
+            if not ids:
+                return None
+            return f"{path}/{ids[i % len(ids)]}", {"json": body(i)}
+        return Scenario(f"PUT {path}/{{id}}", "PUT", build, admin=True, needs=kind)
+
+    def delete(kind: str, path: str):
+        def build(state, i):
+            ids = state["created"].get(kind)
+            if not ids:
+                return None
+            return f"{path}/{ids.pop()}", {}
+        return Scenario(f"DELETE {path}/{{id}}", "DELETE", build, admin=True, needs=kind)
+
+    news_body = lambda i: {
+        "title": f"New {i}", "date": "2030-01-01", "excerpt": "Excerpt",
+        "content": "Content " * 50, "image": "https://example.org/x.jpg",
+    }
+    member_body = lambda i: {
+        "name": f"Member {i}", "position": "Member", "email": f"m{i}@example.com",
+        "image": "https://example.org/m.jpg", "order": 100 + i,
+    }
+    past_body = lambda i: {
+        "title": f"Past {i}", "date": "2020-01-01", "description": "Description",
+        "images": ["https://example.org/p.jpg"],
+    }
+    upcoming_body = lambda i: {
+        "title": f"Upcoming {i}", "date": "2031-01-01", "time": "10:00",
+        "venue": "Hall", "description": "Description",
+    }
+    gallery_body = lambda i: {"url": "https://example.org/g.jpg", "caption": f"Photo {i}"}
+
+    return [
+        # Public reads
+        Scenario("GET /api/", "GET", get("/api/")),
+        Scenario("GET /api/board-members", "GET", get("/api/board-members")),
+        Scenario("GET /api/events/past", "GET", get("/api/events/past")),
+        Scenario("GET /api/events/upcoming", "GET", get("/api/events/upcoming")),
+        Scenario("GET /api/news", "GET", get("/api/news")),
+        Scenario("GET /api/news?fields=", "GET", get("/api/news?limit=20&fields=title,date,excerpt,image")),
+        Scenario("GET /api/news?after=", "GET", get("/api/news?after={news_cursor}")),
+        Scenario("GET /api/news/{id}", "GET", get("/api/news/{news_id}")),
+        Scenario("GET /api/gallery", "GET", get("/api/gallery")),
+        Scenario("GET /api/gallery?after=", "GET", get("/api/gallery?after={gallery_cursor}")),
+        Scenario("GET /api/settings", "GET", get("/api/settings")),
+        Scenario("GET /api/bundle", "GET", get(
+            "/api/bundle?sections=upcoming_events,news,settings&limit=3"
+            "&news.fields=title,date,excerpt,image"
+        )),
+        Scenario("GET /api/images/{name}", "GET", get("/api/images/{upload_name}?w=640")),
+        Scenario("GET /api/search", "GET", get("/api/search?q=blood%20donation"), needs_mongod=True),
+        Scenario("GET /api/sync", "GET", get("/api/sync?limit=100")),
+        Scenario("GET /api/sync?since=", "GET", get("/api/sync?since={sync_token}")),
+        # Each submission comes from its own address, as the rate limit is per client
+        Scenario("POST /api/contact/submit", "POST", lambda s, i: ("/api/contact/submit", {
+            "json": {
+                "name": "Visitor", "email": f"visitor{i}@example.com",
+                "subject": "Hello", "message": f"Message {i}",
+            },
+            "headers": {"X-Forwarded-For": f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"},
+        })),
+        # Authentication
+        Scenario("POST /api/auth/login", "POST", lambda s, i: ("/api/auth/login", {"json": {
+            "email": ADMIN_EMAIL, "password": ADMIN_PASSWORD,
+        }})),
+        Scenario("GET /api/auth/me", "GET", get("/api/auth/me"), admin=True),
+        # Inbox, filled by the contact scenario above
+        Scenario("GET /api/contact/submissions", "GET", get("/api/contact/submissions"), admin=True),
+        Scenario(
+            "GET /api/contact/submissions?status=", "GET",
+            get("/api/contact/submissions?status=new"), admin=True,
+        ),
+        Scenario("GET /api/contact/submissions/counts", "GET", get("/api/contact/submissions/counts"), admin=True),
+        # Admin writes; each update and delete works through the documents created above it
+        create("/api/news", news_body),
+        update("news", "/api/news", lambda i: {"title": f"Edited {i}"}),
+        delete("news", "/api/news"),
+        create("/api/board-members", member_body),
+        update("board_members", "/api/board-members", lambda i: {"position": f"Role {i}"}),
+        delete("board_members", "/api/board-members"),
+        create("/api/events/past", past_body),
+        update("past_events", "/api/events/past", lambda i: {"title": f"Edited {i}"}),
+        delete("past_events", "/api/events/past"),
+        create("/api/events/upcoming", upcoming_body),
+        update("upcoming_events", "/api/events/upcoming", lambda i: {"venue": f"Room {i}"}),
+        delete("upcoming_events", "/api/events/upcoming"),
+        create("/api/gallery", gallery_body),
+        delete("gallery", "/api/gallery"),
+        Scenario("POST /api/news/bulk", "POST", lambda s, i: ("/api/news/bulk", {"json": {
+            "operations": [{"op": "create", "data": news_body(i * 10 + n)} for n in range(10)],
+        }}), admin=True),
+        Scenario("PUT /api/settings", "PUT", lambda s, i: ("/api/settings", {"json": {"awards_won": i}}), admin=True),
+        Scenario("POST /api/upload", "POST", lambda s, i: ("/api/upload", {
+            "files": {"file": ("photo.png", s["png"], "image/png")},
+        }), admin=True),
+    ]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(ordered), 3) if ordered else None,
+        "p50_ms": round(cuts[49], 3) if ordered else None,
+        "p95_ms": round(cuts[94], 3) if ordered else None,
+        "p99_ms": round(cuts[98], 3) if ordered else None,
+        "max_ms": round(ordered[-1], 3) if ordered else None,
+    }
+
+
+async def run_scenario(client, scenario: Scenario, state: dict, requests: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+    headers = state["auth"] if scenario.admin else {}
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            built = scenario.build(state, i)
+            if built is None:
+                break
+            path, kwargs = built
+            request_headers = {**headers, **kwargs.pop("headers", {})}
+            start = time.perf_counter()
+            response = await client.request(scenario.method, path, headers=request_headers, **kwargs)
+            duration = (time.perf_counter() - start) * 1000
+            if response.status_code >= 400:
+                errors += 1
+                continue
+            latencies.append(duration)
+            if scenario.method == "POST" and scenario.admin and "_id" in response.text:
+                state["created"].setdefault(_kind(scenario.name), []).append(response.json()["_id"])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def _kind(name: str) -> str:
+    path = name.split(" ", 1)[1]
+    return {
+        "/api/news": "news",
+        "/api/board-members": "board_members",
+        "/api/events/past": "past_events",
+        "/api/events/upcoming": "upcoming_events",
+        "/api/gallery": "gallery",
+    }.get(path, path)
+
+
+async def prepare_state(client, server) -> dict:
+    """Create the admin account and collect ids and cursors the routes need."""
+    await server.db.users.insert_one({
+        "email": ADMIN_EMAIL,
+        "password": await server.password_hasher.hash(ADMIN_PASSWORD),
+        "name": "Load Test",
+        "role": "admin",
+        "created_at": datetime.utcnow(),
+    })
+    login = await client.post("/api/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+    auth = {"Authorization": f"Bearer {login.json()['token']}"}
+
+    news = await client.get("/api/news?limit=20")
+    gallery = await client.get("/api/gallery?limit=20")
+    png = _png()
+    upload = await client.post("/api/upload", headers=auth, files={"file": ("photo.png", png, "image/png")})
+    return {
+        "auth": auth,
+        "created": {},
+        "png": png,
+        "news_id": news.json()[0]["_id"],
+        "news_cursor": news.headers.get("x-next-cursor", ""),
+        "gallery_cursor": gallery.headers.get("x-next-cursor", ""),
+        "upload_name": upload.json()["filename"],
+        "sync_token": encode_sync_token(datetime.utcnow() - timedelta(hours=1)),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline: dict) -> None:
+    print(f"\nCompared with {baseline.get('commit')} ({baseline.get('timestamp')}):")
+    print(f"{'route':<36} {'rps':>16} {'p95 ms':>18}")
+    for name, result in current["routes"].items():
+        before = baseline.get("routes", {}).get(name)
+        if not before or not before.get("p95_ms") or not result.get("p95_ms"):
+            continue
+        rps_change = (result["throughput_rps"] / before["throughput_rps"] - 1) * 100 if before["throughput_rps"] else 0
+        p95_change = (result["p95_ms"] / before["p95_ms"] - 1) * 100
+        print(
+            f"{name:<36} {result['throughput_rps']:>8.1f} ({rps_change:+5.0f}%) "
+            f"{result['p95_ms']:>9.2f} ({p95_change:+5.0f}%)"
+        )
+
+
+def print_table(routes: Dict[str, dict]) -> None:
+    print(f"{'route':<36} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}")
+    for name, r in routes.items():
+        if r["p50_ms"] is None:
+            print(f"{name:<36} {'-':>8} {'-':>8} {'-':>8} {'-':>8} {r['errors']:>5}")
+            continue
+        print(
+            f"{name:<36} {r['throughput_rps']:>8.1f} {r['p50_ms']:>8.2f} "
+            f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['errors']:>5}"
+        )
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Load test the API routes.")
+    parser.add_argument("--mock", action="store_true",
+                        help="use mongomock-motor instead of the MongoDB at MONGO_URL")
+    parser.add_argument("--db", default=DB_PREFIX,
+                        help=f"database to drop and seed; must start with {DB_PREFIX}")
+    parser.add_argument("--news", type=int, default=len(seed_data.NEWS_ARTICLES_SEED))
+    parser.add_argument("--gallery", type=int, default=len(seed_data.GALLERY_IMAGES_SEED))
+    parser.add_argument("--past-events", type=int, default=len(seed_data.PAST_EVENTS_SEED))
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--only", help="run only routes whose name contains this text")
+    parser.add_argument("--output", type=Path, help="result file (default benchmarks/results/)")
+    parser.add_argument("--compare", type=Path, help="earlier result file to compare against")
+    args = parser.parse_args()
+    if not args.db.startswith(DB_PREFIX):
+        parser.error(f"--db must start with {DB_PREFIX}; that database is dropped")
+
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    # Never whatever DB_NAME the shell exports, which may be a real database
+    os.environ["DB_NAME"] = args.db
+    os.environ.setdefault("SNAPSHOT_DIR", tempfile.mkdtemp(prefix="snapshots-"))
+    # The contact scenario sends X-Forwarded-For as if from behind one proxy
+    os.environ.setdefault("TRUSTED_PROXY_HOPS", "1")
+    if args.mock:
+        import mongomock_motor
+        import motor.motor_asyncio
+
+        motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+
+    import httpx
+    import server
+
+    await server.client.drop_database(os.environ["DB_NAME"])
+    started = time.perf_counter()
+    await seed(server.db, args)
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+    await server.app.router.startup()
+    transport = httpx.ASGITransport(app=server.app)
+    routes = {}
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            state = await prepare_state(client, server)
+            for scenario in scenarios():
+                if args.only and args.only not in scenario.name:
+                    continue
+                if scenario.needs_mongod and args.mock:
+                    print(f"Skipping {scenario.name}: needs a real MongoDB")
+                    continue
+                if scenario.needs and not state["created"].get(scenario.needs):
+                    print(f"Skipping {scenario.name}: no {scenario.needs} were created by this run")
+                    continue
+                routes[scenario.name] = await run_scenario(
+                    client, scenario, state, args.requests, args.concurrency
+                )
+    finally:
+        await server.app.router.shutdown()
+
+    result = {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+        "config": {
+            "backend": "mongomock" if args.mock else "mongod",
+            "news": args.news,
+            "gallery": args.gallery,
+            "past_events": args.past_events,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "routes": routes,
+    }
+    print_table(routes)
+
+    output = args.output or RESULTS_DIR / f"{result['timestamp'].replace(':', '')}-{result['commit'] or 'nogit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(result, json.loads(args.compare.read_text()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,96 @@
+"""Microbenchmark: per-request CPU cost of serializing a news list.
+
+Compares the previous response path (validate each document into a model,
+validate again against ``response_model``, encode with ``jsonable_encoder``
+and ``json.dumps``) with the trusted-document path in serialization.py.
+
+    python benchmarks/serialization.py [--rounds 50]
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from models import NewsArticle
+from serialization import construct_all, render_json
+
+
+def make_docs(count: int) -> List[dict]:
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"Community service drive #{i}",
+            "date": "2024-01-15",
+            "excerpt": "Members gathered to plant trees across the city. " * 2,
+            "content": "Full article text describing the event in detail. " * 40,
+            "image": f"https://example.org/uploads/{i:032x}.jpg",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+response_adapter = TypeAdapter(List[NewsArticle])
+
+
+def validated_path(docs: List[dict]) -> bytes:
+    items = [NewsArticle(**{**doc, "_id": str(doc["_id"])}) for doc in docs]
+    # FastAPI re-validates the return value against response_model
+    items = response_adapter.validate_python(
+        [item.model_dump(by_alias=True) for item in items]
+    )
+    return json.dumps(
+        jsonable_encoder(items, by_alias=True, exclude_none=True),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def trusted_path(docs: List[dict]) -> bytes:
+    return render_json(construct_all(NewsArticle, docs))
+
+
+def cpu_per_call(func, docs_factory, rounds: int) -> float:
+    """Mean CPU milliseconds per call, excluding document generation."""
+    total = 0.0
+    for _ in range(rounds):
+        docs = docs_factory()
+        start = time.process_time()
+        func(docs)
+        total += time.process_time() - start
+    return total / rounds * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    sample = make_docs(3)
+    if validated_path([dict(d) for d in sample]) != trusted_path([dict(d) for d in sample]):
+        print("Serialized output differs between the two paths")
+        return 1
+
+    print(f"{'docs':>6} {'validated ms':>14} {'trusted ms':>12} {'speedup':>8}")
+    for count in (100, 1000):
+        docs = make_docs(count)
+        factory = lambda: [dict(doc) for doc in docs]
+        before = cpu_per_call(validated_path, factory, args.rounds)
+        after = cpu_per_call(trusted_path, factory, args.rounds)
+        print(f"{count:>6} {before:>14.2f} {after:>12.2f} {before / after:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""In-process fan-out of content changes to Server-Sent Events clients.
+
+Each change is formatted as an SSE message once and handed to every
+subscriber's queue, so an idle connection costs one small coroutine and a
+queue. The most recent messages are kept in a ring buffer, which lets a
+reconnecting client resume from its ``Last-Event-ID``. Event ids carry a
+per-process epoch; ids from another process or from before a restart cannot
+be resumed, and such clients are told to reload instead.
+"""
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Optional, Set, Tuple
+
+from serialization import render_json
+
+
+BUFFER_SIZE = 1000
+SUBSCRIBER_QUEUE_SIZE = 256
+HEARTBEAT_SECONDS = 15.0
+# Streams are closed after this long and the client reconnects transparently,
+# so connections never outlive a deploy by much
+MAX_STREAM_SECONDS = 300.0
+RETRY_MILLISECONDS = 3000
+
+
+def format_message(event_id: Optional[str], event: str, data: bytes) -> bytes:
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}".encode())
+    lines.append(f"event: {event}".encode())
+    lines.append(b"data: " + data)
+    return b"\n".join(lines) + b"\n\n"
+
+
+class Subscriber:
+    def __init__(self, collections: Optional[Set[str]]):
+        self.collections = collections
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.lagging = False
+
+    def wants(self, collection: Optional[str]) -> bool:
+        return collection is None or self.collections is None or collection in self.collections
+
+    def offer(self, message: bytes) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Too slow to keep up; the stream ends and the client resumes from the buffer
+            self.lagging = True
+
+
+class Broadcaster:
+    def __init__(self, buffer_size: int = BUFFER_SIZE):
+        self.epoch = format(int(time.time() * 1000), "x")
+        self._sequence = itertools.count(1)
+        self._buffer: Deque[Tuple[int, Optional[str], bytes]] = deque(maxlen=buffer_size)
+        self._subscribers: Set[Subscriber] = set()
+        self.published = 0
+
+    def publish(self, event: str, payload: Dict, collection: Optional[str] = None) -> str:
+        """Send ``payload`` to every subscriber interested in ``collection``.
+
+        Returns the event id.
+        """
+        sequence = next(self._sequence)
+        event_id = f"{self.epoch}-{sequence}"
+        message = format_message(event_id, event, render_json(payload))
+        self._buffer.append((sequence, collection, message))
+        self.published += 1
+        for subscriber in self._subscribers:
+            if subscriber.wants(collection):
+                subscriber.offer(message)
+        return event_id
+
+    def _missed(self, last_event_id: str, subscriber: Subscriber):
+        """Buffered messages after ``last_event_id``, or None if they cannot be replayed."""
+        epoch, _, sequence = last_event_id.partition("-")
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if self._buffer and sequence < self._buffer[0][0] - 1:
+            return None
+        return [
+            message for number, collection, message in self._buffer
+            if number > sequence and subscriber.wants(collection)
+        ]
+
+    async def stream(
+        self,
+        last_event_id: Optional[str] = None,
+        collections: Optional[Set[str]] = None,
+    ) -> AsyncIterator[bytes]:
+        """Yield SSE messages for one client until the stream expires.
+
+        The response cancels the generator when the client disconnects.
+        """
+        subscriber = Subscriber(collections)
+        # Register before replaying so nothing published meanwhile is missed
+        self._subscribers.add(subscriber)
+        try:
+            yield f"retry: {RETRY_MILLISECONDS}\n\n".encode()
+            if last_event_id:
+                missed = self._missed(last_event_id, subscriber)
+                if missed is None:
+                    yield format_message(None, "reset", b'{"reason":"history unavailable"}')
+                else:
+                    for message in missed:
+                        yield message
+                    # Replayed messages may also have been queued live; skip those
+                    replayed = set(missed)
+                    while not subscriber.queue.empty():
+                        message = subscriber.queue.get_nowait()
+                        if message not in replayed:
+                            yield message
+
+            deadline = time.monotonic() + MAX_STREAM_SECONDS
+            while not subscriber.lagging and time.monotonic() < deadline:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                yield message
+        finally:
+            self._subscribers.discard(subscriber)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published_total": self.published,
+        }
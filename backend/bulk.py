@@ -0,0 +1,109 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pydantic import ValidationError
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from models import BulkItemResult, BulkOperation, BulkResponse
+from resources import Resource, new_document, update_fields
+
+
+def _validation_message(exc: ValidationError) -> str:
+    error = exc.errors()[0]
+    location = ".".join(str(part) for part in error["loc"])
+    return f"{location}: {error['msg']}" if location else error["msg"]
+
+
+async def apply_bulk(
+    collection,
+    operations: List[BulkOperation],
+    resource: Resource,
+) -> Tuple[BulkResponse, List[Tuple[str, str, Optional[dict]]]]:
+    """Validate ``operations`` one by one and apply the valid ones in one ``bulk_write``.
+
+    Invalid items are reported in the results without stopping the others.
+    Documents get the same timestamps as the single-item routes. Also
+    returns ``(op, id, fields)`` for every item that was written.
+    """
+    results: List[Optional[BulkItemResult]] = [None] * len(operations)
+    written_fields: Dict[int, Optional[dict]] = {}
+
+    def fail(index: int, op: BulkOperation, status: int, error: str) -> None:
+        results[index] = BulkItemResult(index=index, op=op.op, status=status, id=op.id, error=error)
+
+    # Resolve ids first so updates and deletes of missing documents can be reported
+    targets: Dict[int, ObjectId] = {}
+    seen = set()
+    for index, op in enumerate(operations):
+        if op.op == "create":
+            continue
+        if not op.id or not ObjectId.is_valid(op.id):
+            fail(index, op, 400, "Invalid id")
+        elif op.id in seen:
+            fail(index, op, 409, "Document appears more than once in the batch")
+        else:
+            seen.add(op.id)
+            targets[index] = ObjectId(op.id)
+
+    existing = set()
+    if targets:
+        cursor = collection.find({"_id": {"$in": list(targets.values())}}, {"_id": 1})
+        existing = {doc["_id"] async for doc in cursor}
+
+    now = datetime.utcnow()
+    requests = []
+    request_index = []
+    for index, op in enumerate(operations):
+        if results[index] is not None:
+            continue
+        if op.op != "create" and targets[index] not in existing:
+            fail(index, op, 404, "Not found")
+            continue
+        if op.op == "update" and resource.update_model is None:
+            fail(index, op, 405, "Updates are not supported for this collection")
+            continue
+
+        try:
+            if op.op == "create":
+                doc = new_document(resource, resource.create_model(**(op.data or {})), now)
+                doc["_id"] = ObjectId()
+                requests.append(InsertOne(doc))
+                written_fields[index] = {k: v for k, v in doc.items() if k != "_id"}
+                results[index] = BulkItemResult(index=index, op=op.op, status=201, id=str(doc["_id"]))
+            elif op.op == "update":
+                update_data = update_fields(resource.update_model(**(op.data or {})), now)
+                requests.append(UpdateOne({"_id": targets[index]}, {"$set": update_data}))
+                written_fields[index] = update_data
+                results[index] = BulkItemResult(index=index, op=op.op, status=200, id=op.id)
+            else:
+                requests.append(DeleteOne({"_id": targets[index]}))
+                results[index] = BulkItemResult(index=index, op=op.op, status=200, id=op.id)
+        except ValidationError as exc:
+            fail(index, op, 422, _validation_message(exc))
+            continue
+        request_index.append(index)
+
+    if requests:
+        try:
+            await collection.bulk_write(requests, ordered=False)
+        except BulkWriteError as exc:
+            for error in exc.details.get("writeErrors", []):
+                index = request_index[error["index"]]
+                fail(index, operations[index], 409 if error.get("code") == 11000 else 500, error.get("errmsg", "Write failed"))
+
+    response = BulkResponse(results=results)
+    changes = []
+    for result in results:
+        if result.status >= 400:
+            response.failed += 1
+            continue
+        changes.append((result.op, result.id, written_fields.get(result.index)))
+        if result.op == "create":
+            response.created += 1
+        elif result.op == "update":
+            response.updated += 1
+        else:
+            response.deleted += 1
+    return response, changes
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after ``ttl`` seconds.
+
+    Keys are tuples whose first element is the collection name, so every
+    entry derived from one collection can be dropped with ``invalidate``.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Tuple[float, Any]]" = OrderedDict()
+        self._loading: Dict[Tuple[Hashable, ...], asyncio.Future] = {}
+        self._invalidated: Set[Tuple[Hashable, ...]] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple[Hashable, ...], default: Any = None) -> Any:
+        """Return a fresh cached value, or ``default`` if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Tuple[Hashable, ...], value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entry when full.
+
+        ``ttl`` overrides the cache-wide lifetime for this entry.
+        """
+        lifetime = self.ttl if ttl is None else ttl
+        self._entries[key] = (time.monotonic() + lifetime, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(
+        self,
+        key: Tuple[Hashable, ...],
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return the cached value for ``key`` or load it exactly once.
+
+        Concurrent misses on the same key share a single ``loader`` call so a
+        burst of visitors on a cold cache costs one database round trip.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        pending = self._loading.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await loader()
+        except BaseException as exc:
+            self._invalidated.discard(key)
+            future.set_exception(exc)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            if self._loading.get(key) is future:
+                del self._loading[key]
+
+        # A write may have invalidated the key while we were loading; in that
+        # case the value is still returned but not kept.
+        if key in self._invalidated:
+            self._invalidated.remove(key)
+        else:
+            self.set(key, value)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, collection: str) -> None:
+        """Drop every entry, cached or in flight, derived from ``collection``."""
+        for key in [k for k in self._entries if k[0] == collection]:
+            del self._entries[key]
+        for key in self._loading:
+            if key[0] == collection:
+                self._invalidated.add(key)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+        self._invalidated.update(self._loading)
+
+
+_MISSING = object()
@@ -0,0 +1,179 @@
+import gzip
+from typing import Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+
+from conditional import coded_etag
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+
+# Bodies smaller than this are sent as is; compression would not pay off
+MINIMUM_SIZE = 1000
+
+# Compressing more than this inline would stall the event loop noticeably
+INLINE_LIMIT = 256 * 1024
+
+# Cached bodies are compressed once, so they can afford a slower, denser level
+CACHED_LEVEL = 9
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "image/svg+xml",
+    "text/css",
+    "text/html",
+    "text/plain",
+)
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported encoding from an Accept-Encoding header.
+
+    Brotli wins ties with gzip. Returns ``None`` if neither is acceptable.
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            weights[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in supported_encodings():
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress ``data``; ``level`` defaults to a fast setting for live responses."""
+    if encoding == "br":
+        return brotli.compress(data, quality=4 if level is None else level)
+    return gzip.compress(data, compresslevel=6 if level is None else level)
+
+
+async def compress_async(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    if len(data) > INLINE_LIMIT:
+        return await run_in_threadpool(compress, data, encoding, level)
+    return compress(data, encoding, level)
+
+
+def compressible(content_type: str) -> bool:
+    media_type = content_type.split(";")[0].strip().lower()
+    return media_type in COMPRESSIBLE_TYPES
+
+
+class EncodedBody:
+    """A serialized JSON body kept in a cache with its compressed variants.
+
+    Each variant is produced once, on first request, at a higher compression
+    level than live responses since the cost is paid only once.
+    """
+
+    def __init__(self, body: bytes, headers: Optional[Dict[str, str]] = None):
+        self.body = body
+        self.headers = headers or {}
+        self._variants: Dict[str, bytes] = {}
+
+    async def encoded(self, encoding: Optional[str]) -> bytes:
+        if encoding is None or len(self.body) < MINIMUM_SIZE:
+            return self.body
+        variant = self._variants.get(encoding)
+        if variant is None:
+            variant = await run_in_threadpool(compress, self.body, encoding, CACHED_LEVEL)
+            self._variants[encoding] = variant
+        return variant
+
+    async def response(self, request: Request, response: Response) -> Response:
+        """Build the response, carrying over headers set on ``response``."""
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+        body = await self.encoded(encoding)
+        headers = {
+            key: value for key, value in response.headers.items()
+            if key != "content-length"
+        }
+        headers.update(self.headers)
+        headers["Vary"] = "Accept-Encoding"
+        if body is not self.body:
+            headers["Content-Encoding"] = encoding
+            if "etag" in headers:
+                headers["etag"] = coded_etag(headers["etag"], encoding)
+        return Response(body, media_type="application/json", headers=headers)
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip, as the client prefers.
+
+    Responses that are already encoded, too small, or not a text-like type
+    (images, event streams) pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+        parts = []
+
+        async def compressing_send(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or not compressible(headers.get("content-type", "")):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(parts)
+            headers = MutableHeaders(scope=start_message)
+            if len(body) >= self.minimum_size:
+                body = await compress_async(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                if "etag" in headers:
+                    headers["ETag"] = coded_etag(headers["etag"], encoding)
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, compressing_send)
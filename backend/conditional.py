@@ -0,0 +1,116 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import NamedTuple, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+class Watermark(NamedTuple):
+    """Version of a collection: newest modification time and document count.
+
+    The count changes on inserts and deletes, the timestamp on every update,
+    so together they identify the content of a collection.
+    """
+    last_modified: Optional[datetime]
+    count: int
+
+
+def make_etag(collection: str, watermark: Watermark, variant: str = "") -> str:
+    """Build a strong ETag for a collection response.
+
+    ``variant`` distinguishes representations of the same collection, e.g. a
+    different page or field selection.
+    """
+    last_modified = watermark.last_modified.isoformat() if watermark.last_modified else ""
+    raw = f"{collection}:{last_modified}:{watermark.count}:{variant}"
+    return '"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+# Content codings a response body may be sent in, each with its own ETag
+CONTENT_CODINGS = ("br", "gzip")
+
+
+def coded_etag(etag: str, encoding: Optional[str]) -> str:
+    """The ETag of the representation of ``etag`` in a content coding.
+
+    A gzip or brotli body is a different representation than the identity
+    one, so a strong ETag must not be shared between them.
+    """
+    if not encoding:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def matching_etag(if_none_match: str, etag: str) -> Optional[str]:
+    """The tag in an If-None-Match header that matches ``etag``, if any.
+
+    Tags are compared weakly (RFC 9110), and the coded forms of ``etag``
+    match too, since they all describe the same version.
+    """
+    accepted = {etag} | {coded_etag(etag, encoding) for encoding in CONTENT_CODINGS}
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return etag
+        if tag.removeprefix("W/") in accepted:
+            return tag
+    return None
+
+
+def http_date(value: datetime) -> str:
+    """Format a naive UTC datetime as an HTTP date."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against the current version."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        return matching_etag(if_none_match, etag) is not None
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates only carry whole seconds
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    collection: str,
+    watermark: Watermark,
+    variant: str = "",
+) -> Optional[Response]:
+    """Set validators on ``response`` and return a 304 if the client is current.
+
+    Returns ``None`` when the full body has to be sent.
+    """
+    etag = make_etag(collection, watermark, variant)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if watermark.last_modified is not None:
+        headers["Last-Modified"] = http_date(watermark.last_modified)
+
+    if is_not_modified(request, etag, watermark.last_modified):
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            # Repeat the tag of the coding the client holds
+            headers["ETag"] = matching_etag(if_none_match, etag)
+        headers["Vary"] = "Accept-Encoding"
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Set
+
+from PIL import Image, ImageOps
+
+from cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+# What Pillow raises for truncated, corrupt or oversized images
+IMAGE_ERRORS = (OSError, ValueError, SyntaxError, Image.DecompressionBombError)
+
+# Widths offered in srcset attributes; requests are snapped up to one of these
+DERIVATIVE_WIDTHS = (320, 640, 1280)
+WEBP_QUALITY = 80
+
+UPLOADS_PATH = "/uploads/"
+DERIVATIVES_PATH = "/api/images/"
+
+
+def snap_width(width: int) -> int:
+    """Return the smallest offered width at least ``width`` wide."""
+    for candidate in DERIVATIVE_WIDTHS:
+        if candidate >= width:
+            return candidate
+    return DERIVATIVE_WIDTHS[-1]
+
+
+def derivative_url(url: str, width: int) -> Optional[str]:
+    """URL of the ``width`` pixel WebP variant of an uploaded image.
+
+    Returns ``None`` for images that are not served from our uploads mount,
+    such as external links.
+    """
+    if UPLOADS_PATH not in url:
+        return None
+    base, _, filename = url.rpartition(UPLOADS_PATH)
+    if not filename or "/" in filename:
+        return None
+    return f"{base}{DERIVATIVES_PATH}{filename}?w={width}"
+
+
+def srcset(url: str) -> Optional[str]:
+    """Build a ``srcset`` attribute value for an uploaded image URL."""
+    if derivative_url(url, DERIVATIVE_WIDTHS[0]) is None:
+        return None
+    return ", ".join(f"{derivative_url(url, width)} {width}w" for width in DERIVATIVE_WIDTHS)
+
+
+def render_derivative(source: str, cache_dir: str, width: int) -> str:
+    """Write the WebP derivative of ``source`` at ``width`` and return its path.
+
+    Runs in a worker thread; Pillow releases the GIL while decoding, resizing
+    and encoding, so several renders proceed in parallel. Derivatives are keyed by the source's content
+    hash and width, so identical sources share one cached file.
+    """
+    with open(source, "rb") as handle:
+        digest = hashlib.sha256(handle.read()).hexdigest()[:32]
+    target = Path(cache_dir) / f"{digest}-{width}.webp"
+    if target.exists():
+        return str(target)
+
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        if image.mode not in ("RGB", "RGBA"):
+            has_alpha = "A" in image.getbands() or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+        temp = target.with_name(f".{target.name}.{threading.get_ident()}.tmp")
+        try:
+            image.save(temp, "WEBP", quality=WEBP_QUALITY, method=4)
+        except BaseException:
+            temp.unlink(missing_ok=True)
+            raise
+    os.replace(temp, target)
+    return str(target)
+
+
+class DerivativeStore:
+    """Produces and caches resized WebP variants of uploaded images.
+
+    Rendering happens in a bounded thread pool. Concurrent requests for the same
+    variant share one render, and finished paths are remembered in memory so
+    repeat requests skip the worker entirely. So are sources Pillow cannot
+    decode, which are answered as missing without trying again.
+    """
+
+    def __init__(self, upload_dir: Path, workers: int = 2):
+        self.upload_dir = upload_dir
+        self.cache_dir = upload_dir / ".derived"
+        self.cache_dir.mkdir(exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="images")
+        self._paths = TTLCache(maxsize=4096, ttl=3600)
+        self._warming: Set[asyncio.Task] = set()
+
+    def source_path(self, filename: str) -> Optional[Path]:
+        """Resolve an uploaded file name, refusing anything outside the uploads."""
+        if Path(filename).name != filename or filename.startswith("."):
+            return None
+        path = self.upload_dir / filename
+        return path if path.is_file() else None
+
+    async def get(self, filename: str, width: int) -> Optional[Path]:
+        """Path of the derivative for ``filename``, rendering it if needed.
+
+        Returns ``None`` if there is no such upload or it is not a readable image.
+        """
+        source = self.source_path(filename)
+        if source is None:
+            return None
+        width = snap_width(width)
+
+        async def render():
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(
+                    self._executor, render_derivative, str(source), str(self.cache_dir), width
+                )
+            except IMAGE_ERRORS as exc:
+                logger.warning("Cannot render %s at %spx: %s", filename, width, exc)
+                return ""
+
+        rendered = await self._paths.get_or_load((filename, width), render)
+        if rendered and not Path(rendered).exists():
+            # Removed from disk since it was cached; render it again
+            self._paths.invalidate(filename)
+            rendered = await self._paths.get_or_load((filename, width), render)
+        return Path(rendered) if rendered else None
+
+    def warm(self, filename: str) -> None:
+        """Render every width of a fresh upload in the background."""
+        async def render_all():
+            for width in DERIVATIVE_WIDTHS:
+                try:
+                    if await self.get(filename, width) is None:
+                        return
+                except Exception:
+                    logger.exception("Could not render %s at %spx", filename, width)
+                    return
+
+        task = asyncio.create_task(render_all())
+        self._warming.add(task)
+        task.add_done_callback(self._warming.discard)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,118 @@
+"""Admin inbox over ``contact_submissions``.
+
+The number of submissions in each status is kept in a document of the
+``counters`` collection, updated alongside every write, so the dashboard's
+unread badge never has to count the collection.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+from models import CONTACT_STATUSES
+
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_ID = "contact_submissions"
+
+# Allowed status changes; archived messages can only be restored as read
+STATUS_TRANSITIONS = {
+    "new": {"read", "replied", "archived"},
+    "read": {"new", "replied", "archived"},
+    "replied": {"read", "archived"},
+    "archived": {"read"},
+}
+
+
+async def recount(db) -> Dict[str, int]:
+    """Rebuild the status counters from the collection itself."""
+    counts = {status: 0 for status in CONTACT_STATUSES}
+    async for row in db.contact_submissions.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+        if row["_id"] in counts:
+            counts[row["_id"]] = row["count"]
+    await db.counters.replace_one({"_id": COUNTERS_ID}, {"_id": COUNTERS_ID, **counts}, upsert=True)
+    return counts
+
+
+async def ensure_counters(db) -> None:
+    """Create the counters document on first start."""
+    if await db.counters.find_one({"_id": COUNTERS_ID}) is None:
+        await recount(db)
+
+
+async def _adjust(db, changes: Dict[str, int]) -> None:
+    changes = {status: delta for status, delta in changes.items() if delta}
+    if changes:
+        await db.counters.update_one({"_id": COUNTERS_ID}, {"$inc": changes}, upsert=True)
+
+
+async def record_new(db, count: int) -> None:
+    await _adjust(db, {"new": count})
+
+
+async def get_counts(db) -> Dict[str, int]:
+    counters = await db.counters.find_one({"_id": COUNTERS_ID}) or {}
+    counts = {status: max(0, counters.get(status, 0)) for status in CONTACT_STATUSES}
+    counts["unread"] = counts["new"]
+    return counts
+
+
+def inbox_filter(status: Optional[str], since: Optional[datetime], until: Optional[datetime]) -> dict:
+    query = {}
+    if status:
+        query["status"] = status
+    if since or until:
+        query["created_at"] = {}
+        if since:
+            query["created_at"]["$gte"] = since
+        if until:
+            query["created_at"]["$lt"] = until
+    return query
+
+
+async def set_status(db, submission_id: ObjectId, status: str) -> dict:
+    """Move one submission to ``status``, keeping the counters in step.
+
+    Raises 404 for unknown submissions and 409 for disallowed transitions.
+    """
+    current = await db.contact_submissions.find_one({"_id": submission_id}, {"status": 1})
+    if current is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    old = current.get("status", "new")
+    if old == status:
+        return await db.contact_submissions.find_one({"_id": submission_id})
+    if status not in STATUS_TRANSITIONS.get(old, ()):
+        raise HTTPException(status_code=409, detail=f"Cannot change status from {old} to {status}")
+
+    # Conditional on the old status, so a concurrent change is not counted twice
+    updated = await db.contact_submissions.find_one_and_update(
+        {"_id": submission_id, "status": old},
+        {"$set": {"status": status, "status_changed_at": datetime.utcnow()}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if updated is None:
+        raise HTTPException(status_code=409, detail="Submission was changed concurrently, please retry")
+    await _adjust(db, {old: -1, status: 1})
+    return updated
+
+
+async def archive_many(db, ids: List[ObjectId]) -> int:
+    """Archive the given submissions and return how many changed."""
+    now = datetime.utcnow()
+    archived = 0
+    # One update per source status keeps the counter adjustment exact
+    for status in CONTACT_STATUSES:
+        if "archived" not in STATUS_TRANSITIONS.get(status, ()):
+            continue
+        result = await db.contact_submissions.update_many(
+            {"_id": {"$in": ids}, "status": status},
+            {"$set": {"status": "archived", "status_changed_at": now}},
+        )
+        if result.modified_count:
+            await _adjust(db, {status: -result.modified_count, "archived": result.modified_count})
+            archived += result.modified_count
+    return archived
@@ -0,0 +1,89 @@
+"""Index manifest for every collection.
+
+tests/test_query_plans.py explains the route queries against a real mongod
+and fails if any of them needs a collection scan or an in-memory sort.
+"""
+import logging
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+from sync import TOMBSTONE_DAYS
+
+
+logger = logging.getLogger(__name__)
+
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+    ],
+    "board_members": [
+        IndexModel([("order", ASCENDING)], name="order"),
+        IndexModel([("updated_at", DESCENDING), ("_id", DESCENDING)], name="updated_at_id"),
+    ],
+    "past_events": [
+        IndexModel([("date", DESCENDING), ("_id", DESCENDING)], name="date_id"),
+        IndexModel([("updated_at", DESCENDING), ("_id", DESCENDING)], name="updated_at_id"),
+        IndexModel(
+            [("title", TEXT), ("description", TEXT)],
+            weights={"title": 10, "description": 1},
+            name="search",
+        ),
+    ],
+    "upcoming_events": [
+        IndexModel([("date", ASCENDING)], name="date"),
+        IndexModel([("updated_at", DESCENDING), ("_id", DESCENDING)], name="updated_at_id"),
+        IndexModel(
+            [("title", TEXT), ("venue", TEXT), ("description", TEXT)],
+            weights={"title": 10, "venue": 3, "description": 1},
+            name="search",
+        ),
+    ],
+    "news": [
+        IndexModel([("date", DESCENDING), ("_id", DESCENDING)], name="date_id"),
+        IndexModel([("updated_at", DESCENDING), ("_id", DESCENDING)], name="updated_at_id"),
+        IndexModel(
+            [("title", TEXT), ("excerpt", TEXT), ("content", TEXT)],
+            weights={"title": 10, "excerpt": 5, "content": 1},
+            name="search",
+        ),
+    ],
+    "gallery": [
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id"),
+        IndexModel([("caption", TEXT)], name="search"),
+    ],
+    "site_settings": [
+        IndexModel([("updated_at", DESCENDING)], name="updated_at"),
+    ],
+    # Left by the delete handlers for /api/sync, see sync.py
+    "tombstones": [
+        IndexModel(
+            [("collection", ASCENDING), ("deleted_at", DESCENDING), ("_id", DESCENDING)],
+            name="collection_deleted_at_id",
+        ),
+        IndexModel(
+            [("deleted_at", ASCENDING)],
+            expireAfterSeconds=TOMBSTONE_DAYS * 24 * 3600,
+            name="deleted_at_ttl",
+        ),
+    ],
+    "contact_submissions": [
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id"),
+        IndexModel(
+            [("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="status_created_at_id",
+        ),
+    ],
+}
+
+
+async def ensure_indexes(db) -> None:
+    """Create every index in the manifest. Existing indexes are left alone."""
+    for collection, indexes in INDEXES.items():
+        try:
+            await db[collection].create_indexes(indexes)
+        except OperationFailure as exc:
+            # e.g. duplicate emails blocking the unique index; keep serving
+            logger.error("Could not create indexes on %s: %s", collection, exc)
@@ -0,0 +1,217 @@
+"""Buffered intake for public contact-form submissions.
+
+Submissions are checked against a per-client token bucket and a short-lived
+set of recent message hashes, then queued and acknowledged immediately. A
+background task writes the queue to MongoDB in batches. When the queue is
+full the form answers 503, so a flood of submissions can neither pile up in
+memory nor turn into one database write per request.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+RATE_PER_MINUTE = float(os.environ.get("CONTACT_RATE_PER_MINUTE", "5"))
+BURST = int(os.environ.get("CONTACT_BURST", "3"))
+QUEUE_SIZE = int(os.environ.get("CONTACT_QUEUE_SIZE", "1000"))
+BATCH_SIZE = 100
+FLUSH_INTERVAL = 0.5
+DUPLICATE_WINDOW = 24 * 3600
+WRITE_RETRIES = 3
+
+# Proxies in front of the app that append to X-Forwarded-For; 0 trusts none
+TRUSTED_PROXY_HOPS = int(os.environ.get("TRUSTED_PROXY_HOPS", "0"))
+
+
+def client_address(request) -> str:
+    """Best guess at the submitting client's IP address."""
+    if TRUSTED_PROXY_HOPS:
+        forwarded = [part.strip() for part in request.headers.get("x-forwarded-for", "").split(",") if part.strip()]
+        if len(forwarded) >= TRUSTED_PROXY_HOPS:
+            return forwarded[-TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else "unknown"
+
+
+def content_hash(submission: dict) -> str:
+    """Hash of a submission's sender and text, ignoring case and spacing."""
+    parts = [
+        " ".join(str(submission.get(field, "")).lower().split())
+        for field in ("email", "subject", "message")
+    ]
+    return hashlib.sha256("\x00".join(parts).encode()).hexdigest()
+
+
+class TokenBucket:
+    """Per-key token buckets, forgotten once a key has been idle a while."""
+
+    def __init__(self, rate_per_second: float, burst: int, max_keys: int = 10000):
+        self.rate = rate_per_second
+        self.burst = burst
+        # A bucket idle for this long has refilled completely
+        idle = burst / rate_per_second if rate_per_second else 3600
+        self._buckets = TTLCache(maxsize=max_keys, ttl=idle)
+
+    def take(self, key: str) -> float:
+        """Take a token for ``key``. Returns 0, or the seconds until one is free."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get((key,), (float(self.burst), now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self._buckets.set((key,), (tokens, now))
+            return (1 - tokens) / self.rate if self.rate else 60.0
+        self._buckets.set((key,), (tokens - 1, now))
+        return 0.0
+
+
+class ContactIntake:
+    """Rate limits, de-duplicates, queues and batch-writes submissions."""
+
+    def __init__(self, collection, on_flush=None):
+        self.collection = collection
+        # Awaited with the written documents after each batch
+        self.on_flush = on_flush
+        self.limiter = TokenBucket(RATE_PER_MINUTE / 60, BURST)
+        self._recent = TTLCache(maxsize=10000, ttl=DUPLICATE_WINDOW)
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.accepted = 0
+        self.duplicates = 0
+        self.rate_limited = 0
+        self.rejected = 0
+        self.written = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._stopping = False
+        self._task = asyncio.create_task(self._flush_forever())
+
+    def submit(self, submission: dict, address: str) -> None:
+        """Queue a submission, or raise 429/503 if it cannot be taken now.
+
+        Repeats of a recent message are acknowledged but not stored again.
+        """
+        retry_after = self.limiter.take(address)
+        if retry_after:
+            self.rate_limited += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many messages, please try again later",
+                headers={"Retry-After": str(max(1, round(retry_after)))},
+            )
+
+        digest = content_hash(submission)
+        if self._recent.get((digest,)):
+            self.duplicates += 1
+            return
+
+        if self._queue is None:
+            raise RuntimeError("ContactIntake.start() has not been called")
+        try:
+            self._queue.put_nowait({**submission, "content_hash": digest})
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="We are receiving a lot of messages, please try again shortly",
+                headers={"Retry-After": "30"},
+            )
+        self._recent.set((digest,), True)
+        self.accepted += 1
+
+    async def _next_batch(self) -> List[dict]:
+        """Wait for submissions; cut short by the ``None`` that stop() queues."""
+        first = await self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = asyncio.get_running_loop().time() + FLUSH_INTERVAL
+        while len(batch) < BATCH_SIZE:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                submission = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if submission is None:
+                break
+            batch.append(submission)
+        return batch
+
+    async def _write(self, batch: List[dict]) -> None:
+        for attempt in range(WRITE_RETRIES):
+            try:
+                await self.collection.insert_many(batch, ordered=False)
+                break
+            except BulkWriteError as exc:
+                # insert_many set each _id, so a retry only trips over the
+                # documents already written; anything else is a real failure
+                if all(error.get("code") == 11000 for error in exc.details.get("writeErrors", [])):
+                    break
+                logger.warning("Contact batch write failed (attempt %d): %s", attempt + 1, exc)
+            except PyMongoError as exc:
+                logger.warning("Contact batch write failed (attempt %d): %s", attempt + 1, exc)
+            await asyncio.sleep(2 ** attempt)
+        else:
+            self.dropped += len(batch)
+            logger.error("Dropped %d contact submissions after %d attempts", len(batch), WRITE_RETRIES)
+            return
+
+        self.written += len(batch)
+        if self.on_flush:
+            try:
+                await self.on_flush(batch)
+            except Exception:
+                logger.exception("Contact flush hook failed")
+
+    async def _flush_forever(self) -> None:
+        while not self._stopping:
+            batch = await self._next_batch()
+            if batch:
+                await self._write(batch)
+
+    async def stop(self) -> None:
+        """Stop the flusher and write whatever is still queued.
+
+        The flusher is not cancelled, so a batch it already took off the
+        queue is written (or counted as dropped) before this returns.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        try:
+            # Wakes a flusher waiting on an empty queue; a full one never waits
+            self._queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+        await self._task
+        remaining = []
+        while not self._queue.empty():
+            submission = self._queue.get_nowait()
+            if submission is not None:
+                remaining.append(submission)
+        for start in range(0, len(remaining), BATCH_SIZE):
+            await self._write(remaining[start:start + BATCH_SIZE])
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "accepted_total": self.accepted,
+            "duplicates_total": self.duplicates,
+            "rate_limited_total": self.rate_limited,
+            "rejected_total": self.rejected,
+            "written_total": self.written,
+            "dropped_total": self.dropped,
+        }
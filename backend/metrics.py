@@ -0,0 +1,284 @@
+"""Request, MongoDB and event-loop metrics in Prometheus text format.
+
+Everything is recorded in process with plain counters and fixed-bucket
+histograms, so the overhead per request is a few dictionary updates. Each
+worker process exposes its own numbers on ``/metrics``.
+"""
+import asyncio
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = labels + (extra,) if extra else labels
+    if not pairs:
+        return ""
+    escaped = (
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        # Per label set: a count per bucket (plus +Inf), then the sum
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                yield f"{self.name}_bucket{_format_labels(labels, ('le', le))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(total[0])}"
+            yield f"{self.name}_count{_format_labels(labels)} {cumulative}"
+
+
+class GaugeCallback:
+    """Gauge whose values are read from ``source`` at scrape time.
+
+    ``source`` returns a mapping of label dicts (as sorted tuples) to values.
+    """
+
+    def __init__(self, name: str, help: str, source: Callable[[], Dict[Labels, float]], kind: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.source = source
+        self.kind = kind
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labels, value in sorted(self.source().items()):
+            yield f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            try:
+                lines.extend(metric.collect())
+            except Exception:
+                logger.exception("Could not collect metric %s", metric.name)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Time to serve a request, by route.", LATENCY_BUCKETS
+))
+response_size = registry.register(Histogram(
+    "http_response_size_bytes", "Response body size as sent, by route.", SIZE_BUCKETS
+))
+mongo_duration = registry.register(Histogram(
+    "mongo_command_duration_seconds", "MongoDB command round trip time, by collection.", LATENCY_BUCKETS
+))
+mongo_failures = registry.register(Counter(
+    "mongo_command_failures_total", "MongoDB commands that returned an error."
+))
+loop_lag = registry.register(Histogram(
+    "event_loop_lag_seconds", "How late the event loop woke up the lag probe.", LAG_BUCKETS
+))
+loop_stalls = registry.register(Counter(
+    "event_loop_stalls_total", "Probe wake-ups delayed past the stall threshold."
+))
+
+
+def route_label(scope) -> str:
+    """Route template for a request, e.g. ``/api/news/{article_id}``."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Static mounts leave their prefix in root_path
+    if scope.get("root_path"):
+        return scope["root_path"]
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Time each request and measure the body it sends, labelled by route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        size = 0
+
+        async def measuring_send(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, measuring_send)
+        finally:
+            route = route_label(scope)
+            method = scope["method"]
+            request_duration.observe(
+                time.perf_counter() - start, method=method, route=route, status=str(status_code)
+            )
+            response_size.observe(size, method=method, route=route)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every MongoDB command by collection and command name.
+
+    Pass an instance in the client's ``event_listeners``. Callbacks run on
+    the driver's threads, hence the lock around the in-flight table.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Tuple, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(event) -> Tuple:
+        return (event.connection_id, event.request_id)
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = "-"
+        with self._lock:
+            self._in_flight[self._key(event)] = (collection, event.command_name)
+
+    def _finish(self, event):
+        with self._lock:
+            return self._in_flight.pop(self._key(event), ("-", event.command_name))
+
+    def succeeded(self, event):
+        collection, command = self._finish(event)
+        mongo_duration.observe(event.duration_micros / 1e6, collection=collection, command=command)
+
+    def failed(self, event):
+        collection, command = self._finish(event)
+        mongo_duration.observe(event.duration_micros / 1e6, collection=collection, command=command)
+        mongo_failures.inc(collection=collection, command=command)
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag by timing a periodic sleep.
+
+    A wake-up later than ``threshold`` means something blocked the loop, such
+    as synchronous I/O or CPU-heavy work in a handler, and is logged.
+    """
+
+    def __init__(self, interval: float = 0.5, threshold: float = 0.1):
+        self.interval = interval
+        self.threshold = threshold
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            loop_lag.observe(lag)
+            if lag > self.threshold:
+                loop_stalls.inc()
+                logger.warning("Event loop blocked for %.0f ms", lag * 1000)
+
+
+def cache_gauges(caches: Dict[str, object]) -> None:
+    """Expose hit, miss and size counters of named TTLCache instances."""
+    def values(attribute):
+        return lambda: {(("cache", name),): getattr(cache, attribute) for name, cache in caches.items()}
+
+    registry.register(GaugeCallback("cache_hits_total", "Cache lookups served from memory.", values("hits"), "counter"))
+    registry.register(GaugeCallback("cache_misses_total", "Cache lookups that had to load.", values("misses"), "counter"))
+    registry.register(GaugeCallback(
+        "cache_entries", "Entries currently held.",
+        lambda: {(("cache", name),): len(cache) for name, cache in caches.items()},
+    ))
+
+
+def stats_gauges(prefix: str, help: str, stats: Callable[[], Dict[str, float]]) -> None:
+    """Expose every value of a ``stats()`` dict as ``<prefix>_<key>``."""
+    for key in stats():
+        registry.register(GaugeCallback(
+            f"{prefix}_{key}", f"{help} ({key.replace('_', ' ')}).",
+            lambda key=key: {(): stats()[key]},
+            "counter" if key.endswith("_total") else "gauge",
+        ))
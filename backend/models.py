@@ -1,8 +1,14 @@
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, computed_field, create_model
+from typing import List, Literal, Optional, Type
 from datetime import datetime
 from bson import ObjectId
 
+from images import srcset
+
+
+# Largest number of items accepted by the bulk endpoints
+MAX_BULK_OPERATIONS = 500
+
 
 class PyObjectId(ObjectId):
     @classmethod
@@ -20,6 +26,23 @@ class PyObjectId(ObjectId):
         field_schema.update(type="string")
 
 
+def partial_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """Build a copy of ``model`` with every field optional.
+
+    Used as the response model of list endpoints that accept ``fields=``, where
+    only the selected fields are present in each item.
+    """
+    fields = {
+        name: (Optional[field.annotation], Field(None, alias=field.alias))
+        for name, field in model.model_fields.items()
+    }
+    return create_model(
+        f"{model.__name__}Partial",
+        __config__=ConfigDict(populate_by_name=True),
+        **fields,
+    )
+
+
 # User Models
 class UserCreate(BaseModel):
     email: EmailStr
@@ -100,6 +123,12 @@ class PastEvent(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    @computed_field
+    @property
+    def image_srcsets(self) -> List[Optional[str]]:
+        """Responsive ``srcset`` for each entry of ``images`` (None if external)."""
+        return [srcset(url) for url in self.images]
+
     class Config:
         populate_by_name = True
         json_encoders = {ObjectId: str}
@@ -183,6 +212,12 @@ class GalleryImage(BaseModel):
     caption: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+    @computed_field
+    @property
+    def srcset(self) -> Optional[str]:
+        """Responsive ``srcset`` for ``url`` (None if the image is external)."""
+        return srcset(self.url)
+
     class Config:
         populate_by_name = True
         json_encoders = {ObjectId: str}
@@ -196,6 +231,30 @@ class ContactSubmit(BaseModel):
     message: str
 
 
+CONTACT_STATUSES = ("new", "read", "replied", "archived")
+
+
+class ContactSubmission(BaseModel):
+    id: str = Field(alias="_id")
+    name: str
+    email: str
+    subject: str
+    message: str
+    status: str = "new"
+    created_at: datetime
+
+    class Config:
+        populate_by_name = True
+
+
+class ContactStatusUpdate(BaseModel):
+    status: Literal["new", "read", "replied", "archived"]
+
+
+class ContactArchiveRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BULK_OPERATIONS)
+
+
 class ContactInfo(BaseModel):
     address: str
     email: EmailStr
@@ -223,4 +282,53 @@ class SiteSettingsUpdate(BaseModel):
     active_members: Optional[int] = None
     total_events: Optional[int] = None
     lives_impacted: Optional[int] = None
-    awards_won: Optional[int] = None
\ No newline at end of file
+    awards_won: Optional[int] = None
+
+
+# Bulk Models
+class BulkOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[str] = None
+    data: Optional[dict] = None
+
+
+class BulkRequest(BaseModel):
+    operations: List[BulkOperation] = Field(..., min_length=1, max_length=MAX_BULK_OPERATIONS)
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    op: str
+    status: int
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkResponse(BaseModel):
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    failed: int = 0
+    results: List[BulkItemResult]
+
+
+# Search Models
+class SearchResult(BaseModel):
+    id: str = Field(alias="_id")
+    type: str
+    title: str
+    snippet: str
+    date: Optional[str] = None
+    image: Optional[str] = None
+    score: float
+
+    class Config:
+        populate_by_name = True
+
+
+# Sparse fieldset variants of the public list models
+BoardMemberPartial = partial_model(BoardMember)
+PastEventPartial = partial_model(PastEvent)
+UpcomingEventPartial = partial_model(UpcomingEvent)
+NewsArticlePartial = partial_model(NewsArticle)
+GalleryImagePartial = partial_model(GalleryImage)
@@ -0,0 +1,69 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(doc: dict, sort_field: str) -> str:
+    """Build an opaque cursor pointing just past ``doc`` in keyset order."""
+    value = doc.get(sort_field)
+    if isinstance(value, datetime):
+        value = {"$date": value.isoformat()}
+    raw = json.dumps([value, str(doc["_id"])], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, ObjectId]:
+    """Decode a cursor into its sort value and ``_id``.
+
+    Raises ``ValueError`` for anything that was not produced by ``encode_cursor``.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["$date"])
+        return value, ObjectId(last_id)
+    except (ValueError, TypeError, KeyError, InvalidId) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def encode_offset_cursor(offset: int) -> str:
+    """Build an opaque cursor for result lists ranked by score, not a key."""
+    raw = json.dumps({"offset": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    """Decode a cursor from ``encode_offset_cursor``, raising ``ValueError`` if bad."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = json.loads(base64.urlsafe_b64decode(padded.encode()))["offset"]
+    except (ValueError, TypeError, KeyError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset
+
+
+def keyset_filter(sort_field: str, direction: int, cursor: str) -> dict:
+    """Build the filter selecting documents after ``cursor``.
+
+    ``_id`` breaks ties between documents sharing a sort value, so the sort
+    spec has to be ``[(sort_field, direction), ("_id", direction)]``.
+    """
+    value, last_id = decode_cursor(cursor)
+    op = "$lt" if direction < 0 else "$gt"
+    return {
+        "$or": [
+            {sort_field: {op: value}},
+            {sort_field: value, "_id": {op: last_id}},
+        ]
+    }
@@ -0,0 +1,57 @@
+from typing import Optional, Type
+
+from pydantic import BaseModel
+
+
+def build_projection(
+    fields: Optional[str],
+    model: Type[BaseModel],
+    required: tuple = (),
+) -> Optional[dict]:
+    """Translate a ``fields=`` query value into a Mongo projection.
+
+    ``fields`` is a comma separated list of ``model`` field names. A list
+    field may be suffixed with ``:N`` to keep only its first N items, e.g.
+    ``images:1`` for a thumbnail. ``required`` names fields that are always
+    projected, such as the pagination sort key. Returns ``None`` when no
+    selection was requested. Raises ``ValueError`` for unknown fields.
+    """
+    if not fields:
+        return None
+
+    projection = {}
+    for item in fields.split(","):
+        name, _, size = item.strip().partition(":")
+        if not name or name in ("id", "_id"):
+            continue
+        if name not in model.model_fields:
+            raise ValueError(f"Unknown field: {name}")
+        if size:
+            if not size.isdigit() or int(size) < 1:
+                raise ValueError(f"Invalid item count for {name}: {size}")
+            projection[name] = {"$slice": int(size)}
+        else:
+            projection[name] = 1
+
+    for name in required:
+        projection.setdefault(name, 1)
+    return projection
+
+
+def model_projection(model: Type[BaseModel]) -> dict:
+    """Projection of every field ``model`` reads, for fetching whole items."""
+    return {
+        field.alias or name: 1
+        for name, field in model.model_fields.items()
+        if (field.alias or name) != "_id"
+    }
+
+
+def projection_key(projection: Optional[dict]) -> str:
+    """Stable string form of a projection for cache keys and ETag variants."""
+    if not projection:
+        return ""
+    return ",".join(
+        f"{name}:{value['$slice']}" if isinstance(value, dict) else name
+        for name, value in sorted(projection.items())
+    )
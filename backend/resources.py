@@ -0,0 +1,121 @@
+"""Declarations of the public content collections.
+
+server.py turns each ``Resource`` into its list, create, update, delete and
+bulk routes. The bundle, sync feed, snapshots and watermarks are built from
+the same declarations, so a new content type only needs an entry here.
+"""
+from datetime import datetime
+from typing import NamedTuple, Optional, Type
+
+from bson import ObjectId
+from pydantic import BaseModel
+
+from models import (
+    BoardMember, BoardMemberCreate, BoardMemberUpdate, BoardMemberPartial,
+    PastEvent, PastEventCreate, PastEventUpdate, PastEventPartial,
+    UpcomingEvent, UpcomingEventCreate, UpcomingEventUpdate, UpcomingEventPartial,
+    NewsArticle, NewsArticleCreate, NewsArticleUpdate, NewsArticlePartial,
+    GalleryImage, GalleryImageCreate, GalleryImagePartial,
+)
+
+
+class Resource(NamedTuple):
+    collection: str
+    # Route prefix under /api
+    path: str
+    # Singular name used in messages, e.g. "Board member not found"
+    label: str
+    model: Type[BaseModel]
+    # Read model with every field optional, for sparse fieldsets
+    partial_model: Type[BaseModel]
+    create_model: Type[BaseModel]
+    # None for collections whose documents are never edited
+    update_model: Optional[Type[BaseModel]]
+    sort_field: str
+    direction: int
+    # Keyset pages of MAX_PAGE_SIZE, or the whole (short) collection at once
+    paginated: bool
+    # Name of the id in single-item paths, e.g. <path>/{member_id}
+    id_param: str = "item_id"
+    # Serve GET <path>/{id}
+    detail: bool = False
+    # Replaces ``item_name`` in the create, update and delete operation ids
+    operation_name: Optional[str] = None
+    # Verb of the create route's description, "<verb> a new <label>"
+    create_verb: str = "Create"
+    # Fields listed when a request does not select any, in ``fields`` syntax;
+    # None lists every field
+    default_fields: Optional[str] = None
+
+    @property
+    def timestamp_field(self) -> str:
+        """Field set on every write, which watermarks and sync compare."""
+        return "updated_at" if self.update_model is not None else "created_at"
+
+    @property
+    def item_name(self) -> str:
+        return self.label.lower().replace(" ", "_")
+
+    @property
+    def write_name(self) -> str:
+        return self.operation_name or self.item_name
+
+
+RESOURCES = (
+    Resource(
+        "board_members", "/board-members", "Board member",
+        BoardMember, BoardMemberPartial, BoardMemberCreate, BoardMemberUpdate,
+        "order", 1, paginated=False, id_param="member_id",
+    ),
+    Resource(
+        "past_events", "/events/past", "Past event",
+        PastEvent, PastEventPartial, PastEventCreate, PastEventUpdate,
+        "date", -1, paginated=True, id_param="event_id",
+    ),
+    Resource(
+        "upcoming_events", "/events/upcoming", "Upcoming event",
+        UpcomingEvent, UpcomingEventPartial, UpcomingEventCreate, UpcomingEventUpdate,
+        "date", 1, paginated=False, id_param="event_id",
+    ),
+    Resource(
+        "news", "/news", "News article",
+        NewsArticle, NewsArticlePartial, NewsArticleCreate, NewsArticleUpdate,
+        "date", -1, paginated=True, id_param="article_id", detail=True, operation_name="news",
+    ),
+    # Gallery images are added and removed, never edited
+    Resource(
+        "gallery", "/gallery", "Gallery image",
+        GalleryImage, GalleryImagePartial, GalleryImageCreate, None,
+        "created_at", -1, paginated=True, id_param="image_id", create_verb="Add",
+    ),
+)
+
+
+def new_document(resource: Resource, data: BaseModel, now: Optional[datetime] = None) -> dict:
+    """The document to insert for ``data``, with its timestamps."""
+    now = now or datetime.utcnow()
+    doc = data.dict()
+    doc["created_at"] = now
+    if resource.update_model is not None:
+        doc["updated_at"] = now
+    return doc
+
+
+def update_fields(data: BaseModel, now: Optional[datetime] = None) -> dict:
+    """The ``$set`` of an update: the fields that were sent, and ``updated_at``."""
+    fields = {k: v for k, v in data.dict().items() if v is not None}
+    fields["updated_at"] = now or datetime.utcnow()
+    return fields
+
+
+def changed_filter(item_id: ObjectId, fields: dict) -> Optional[dict]:
+    """Filter matching the item only if setting ``fields`` would change it.
+
+    ``updated_at`` does not count, so an update that repeats the current
+    values matches nothing and is never written. Returns ``None`` when
+    nothing but ``updated_at`` was sent.
+    """
+    differs = [{name: {"$ne": value}} for name, value in fields.items() if name != "updated_at"]
+    if not differs:
+        return None
+    return {"_id": item_id, "$or": differs}
@@ -0,0 +1,138 @@
+import asyncio
+import html
+import re
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Tuple
+
+from models import SearchResult
+from serialization import construct
+
+
+# Deepest result reachable by paging; text search ranks every match, so
+# going further costs more than it is worth to a visitor
+MAX_SEARCH_DEPTH = 200
+
+SNIPPET_LENGTH = 160
+
+# Suffixes stripped before highlighting, to roughly follow Mongo's stemming
+_SUFFIXES = ("ing", "ed", "es", "s")
+
+
+class SearchSource(NamedTuple):
+    collection: str
+    type: str
+    title_field: str
+    # Fields the snippet is cut from, in order of preference
+    text_fields: Tuple[str, ...]
+    date_field: str
+    image_field: Optional[str]
+
+
+# Collections covered by /api/search; each has a "search" text index
+SEARCH_SOURCES = (
+    SearchSource("news", "news", "title", ("excerpt", "content"), "date", "image"),
+    SearchSource("past_events", "past_event", "title", ("description",), "date", "images"),
+    SearchSource("upcoming_events", "upcoming_event", "title", ("description", "venue"), "date", None),
+    SearchSource("gallery", "gallery", "caption", ("caption",), "created_at", "url"),
+)
+
+
+def search_terms(q: str) -> List[str]:
+    """Words of a search query, without negated terms or phrase quotes."""
+    words = re.findall(r"-?\w+", q.lower())
+    return [word for word in words if not word.startswith("-")]
+
+
+def _term_pattern(terms: List[str]) -> Optional["re.Pattern"]:
+    stems = []
+    for term in terms:
+        for suffix in _SUFFIXES:
+            if term.endswith(suffix) and len(term) - len(suffix) >= 3:
+                term = term[: -len(suffix)]
+                break
+        stems.append(re.escape(term))
+    if not stems:
+        return None
+    return re.compile(r"\b(?:" + "|".join(stems) + r")\w*", re.IGNORECASE)
+
+
+def highlight(text: str, terms: List[str], length: int = SNIPPET_LENGTH) -> str:
+    """Cut a snippet of ``text`` around the first match and mark every match.
+
+    The text is HTML-escaped, and matches are wrapped in ``<mark>`` tags.
+    """
+    pattern = _term_pattern(terms)
+    match = pattern.search(text) if pattern else None
+    start = 0
+    if match and match.start() > length // 3:
+        start = text.rfind(" ", 0, match.start() - length // 3) + 1
+    snippet = text[start:start + length]
+    if start + length < len(text):
+        snippet = snippet[: snippet.rfind(" ")] if " " in snippet else snippet
+        snippet += "…"
+    if start > 0:
+        snippet = "…" + snippet
+
+    if not pattern:
+        return html.escape(snippet)
+    # Match on the raw text, so a term like "amp" cannot land inside an entity
+    parts, end = [], 0
+    for found in pattern.finditer(snippet):
+        parts.append(html.escape(snippet[end:found.start()]))
+        parts.append(f"<mark>{html.escape(found.group(0))}</mark>")
+        end = found.end()
+    parts.append(html.escape(snippet[end:]))
+    return "".join(parts)
+
+
+def _to_result(source: SearchSource, doc: dict, terms: List[str]) -> SearchResult:
+    text = next((doc[field] for field in source.text_fields if doc.get(field)), "")
+    date = doc.get(source.date_field)
+    if isinstance(date, datetime):
+        date = date.strftime("%Y-%m-%d")
+    image = doc.get(source.image_field) if source.image_field else None
+    if isinstance(image, list):
+        image = image[0] if image else None
+    return construct(SearchResult, {
+        "_id": doc["_id"],
+        "type": source.type,
+        "title": doc.get(source.title_field, ""),
+        "snippet": highlight(text, terms),
+        "date": date,
+        "image": image,
+        "score": round(doc["score"], 4),
+    })
+
+
+async def _search_source(db, source: SearchSource, q: str, depth: int, terms: List[str]):
+    fields = {source.title_field, source.date_field, *source.text_fields}
+    if source.image_field:
+        fields.add(source.image_field)
+    projection = {field: 1 for field in fields}
+    projection["score"] = {"$meta": "textScore"}
+    docs = await db[source.collection].find({"$text": {"$search": q}}, projection).sort(
+        [("score", {"$meta": "textScore"})]
+    ).limit(depth).to_list(depth)
+    return [_to_result(source, doc, terms) for doc in docs]
+
+
+async def run_search(db, q: str, offset: int, limit: int) -> Tuple[List[SearchResult], bool]:
+    """Rank matches from every searchable collection together.
+
+    Each collection contributes its own best ``offset + limit + 1`` matches,
+    which is all a merged page at ``offset`` can draw from. Returns the page
+    and whether more results follow it.
+    """
+    depth = offset + limit + 1
+    terms = search_terms(q)
+    per_source = await asyncio.gather(
+        *(_search_source(db, source, q, depth, terms) for source in SEARCH_SOURCES)
+    )
+    ranked = sorted(
+        (result for results in per_source for result in results),
+        key=lambda result: result.score,
+        reverse=True,
+    )
+    page = ranked[offset:offset + limit]
+    has_more = len(ranked) > offset + limit and offset + limit < MAX_SEARCH_DEPTH
+    return page, has_more
@@ -0,0 +1,33 @@
+"""JSON encoding for documents read back from MongoDB.
+
+Everything in the database went through the request models on the way in,
+so public reads build model instances with ``model_construct`` instead of
+validating every field again. Payloads are then encoded by pydantic-core's
+serializer (the one behind ``TypeAdapter.dump_json``), which handles aliases,
+computed fields and datetimes natively. The models in models.py remain the
+routes' ``response_model`` and so still describe the OpenAPI schema.
+"""
+from typing import Any, Iterable, List, Type
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+def construct(model: Type[BaseModel], doc: dict) -> BaseModel:
+    """Build ``model`` from a trusted document without validating it."""
+    if "_id" in doc:
+        doc["_id"] = str(doc["_id"])
+    return model.model_construct(**doc)
+
+
+def construct_all(model: Type[BaseModel], docs: Iterable[dict]) -> List[BaseModel]:
+    return [construct(model, doc) for doc in docs]
+
+
+def render_json(data: Any) -> bytes:
+    """Serialize data exactly like the API's JSON responses.
+
+    Output matches FastAPI's ``response_model_exclude_none`` encoding byte for
+    byte: fields by alias, ``None`` values dropped, compact separators.
+    """
+    return to_json(data, by_alias=True, exclude_none=True)
@@ -1,28 +1,54 @@
-from fastapi import FastAPI, APIRouter, Depends, HTTPException, status, File, UploadFile
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Request, Response, status, File, UploadFile
+from fastapi import Path as PathParam
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from starlette.staticfiles import StaticFiles
+from starlette.responses import FileResponse, JSONResponse
 from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
 import os
+from functools import partial
 import logging
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from bson import ObjectId
-import shutil
-import uuid
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
 
 from models import (
     User, UserCreate, UserLogin,
-    BoardMember, BoardMemberCreate, BoardMemberUpdate,
-    PastEvent, PastEventCreate, PastEventUpdate,
-    UpcomingEvent, UpcomingEventCreate, UpcomingEventUpdate,
-    NewsArticle, NewsArticleCreate, NewsArticleUpdate,
-    GalleryImage, GalleryImageCreate,
-    ContactSubmit, SiteSettings, SiteSettingsUpdate
+    SearchResult, BulkRequest, BulkResponse,
+    ContactSubmit, ContactSubmission, ContactStatusUpdate, ContactArchiveRequest, SiteSettings, SiteSettingsUpdate
+)
+from cache import TTLCache
+from indexes import ensure_indexes
+from conditional import Watermark, conditional_response, make_etag
+from pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE,
+    decode_offset_cursor, encode_cursor, encode_offset_cursor, keyset_filter
+)
+from projection import build_projection, model_projection, projection_key
+from uploads import MAX_UPLOAD_BYTES, UploadSizeLimitMiddleware, UploadStaticFiles, save_upload
+from images import DerivativeStore
+from bulk import apply_bulk
+from intake import ContactIntake, client_address
+import inbox
+from watcher import ContentWatcher
+from broadcast import Broadcaster
+from sync import (
+    DEFAULT_SYNC_LIMIT, MAX_SYNC_LIMIT, SyncSource, latest_delete, load_changes, record_deletes,
+)
+from resources import RESOURCES, Resource, changed_filter, new_document, update_fields
+from search import MAX_SEARCH_DEPTH, SEARCH_SOURCES, run_search
+from snapshots import SnapshotStaticFiles, SnapshotStore
+from serialization import construct, construct_all, render_json
+from compression import CompressionMiddleware, EncodedBody
+from metrics import (
+    LoopLagMonitor, MetricsMiddleware, MongoCommandMetrics, cache_gauges, registry, stats_gauges
 )
 from auth import (
-    get_password_hash, verify_password, create_access_token, get_current_user
+    password_hasher, token_cache, create_access_token, get_current_user
 )
 from seed_data import (
     BOARD_MEMBERS_SEED, PAST_EVENTS_SEED, UPCOMING_EVENTS_SEED,
@@ -37,26 +63,301 @@ load_dotenv(ROOT_DIR / '.env')
 UPLOAD_DIR = Path("/app/uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+# Resized WebP variants of uploads, rendered in a worker thread pool
+image_derivatives = DerivativeStore(
+    UPLOAD_DIR, workers=int(os.environ.get('IMAGE_WORKERS', '2'))
+)
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    # Fail fast so public reads can fall back to the snapshots
+    serverSelectionTimeoutMS=int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+    event_listeners=[MongoCommandMetrics()],
+)
 db = client[os.environ['DB_NAME']]
 
+# In-process cache for the public collection reads. Entries are dropped by the
+# admin write handlers, the TTL only bounds staleness from out-of-band edits.
+public_cache = TTLCache(
+    maxsize=int(os.environ.get('CACHE_MAX_ENTRIES', '256')),
+    ttl=float(os.environ.get('CACHE_TTL_SECONDS', '300')),
+)
+
+# Search results, kept apart so that arbitrary queries cannot push the list
+# bodies and watermarks out of the public cache. Keys carry every source's
+# ETag, so entries never need invalidating.
+search_cache = TTLCache(
+    maxsize=int(os.environ.get('SEARCH_CACHE_MAX_ENTRIES', '64')),
+    ttl=float(os.environ.get('SEARCH_CACHE_TTL_SECONDS', '60')),
+)
+
+# Admin profiles for /auth/me. Users are never edited in place, so a short TTL
+# is all the invalidation needed.
+profile_cache = TTLCache(
+    maxsize=256,
+    ttl=float(os.environ.get('PROFILE_CACHE_TTL_SECONDS', '300')),
+)
+
+# Flags handlers that block the event loop, see metrics.py
+loop_monitor = LoopLagMonitor(
+    threshold=float(os.environ.get('LOOP_LAG_THRESHOLD_SECONDS', '0.1')),
+)
+cache_gauges({
+    "public": public_cache, "search": search_cache, "profile": profile_cache, "token": token_cache,
+})
+stats_gauges("password_hasher", "bcrypt worker pool", password_hasher.stats)
+
+# Public contact form submissions are queued and written in batches
+contact_intake = ContactIntake(
+    db.contact_submissions, on_flush=lambda batch: inbox.record_new(db, len(batch))
+)
+stats_gauges("contact_intake", "Contact form intake queue", contact_intake.stats)
+
+# Pushes admin writes to /api/stream subscribers connected to this worker
+broadcaster = Broadcaster()
+stats_gauges("stream", "Live update subscribers", broadcaster.stats)
+
 # Create the main app without a prefix
 app = FastAPI()
 
 # Mount static files for uploads
-app.mount("/uploads", StaticFiles(directory="/app/uploads"), name="uploads")
+app.mount("/uploads", UploadStaticFiles(directory="/app/uploads"), name="uploads")
+
+# Pre-rendered public JSON, see snapshots.py
+SNAPSHOT_DIR = Path(os.environ.get('SNAPSHOT_DIR', '/app/snapshots'))
+SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+app.mount("/snapshots", SnapshotStaticFiles(directory=SNAPSHOT_DIR), name="snapshots")
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
 
-# Helper function to convert MongoDB document to dict
-def doc_to_dict(doc):
-    if doc and "_id" in doc:
-        doc["_id"] = str(doc["_id"])
-    return doc
+# Timestamp field that tracks modifications in each public collection
+WATERMARK_FIELDS = {
+    **{resource.collection: resource.timestamp_field for resource in RESOURCES},
+    "site_settings": "updated_at",
+}
+
+
+async def get_watermark(collection: str) -> Watermark:
+    """Get the cached version watermark of a public collection."""
+    async def load():
+        field = WATERMARK_FIELDS[collection]
+        latest = await db[collection].find_one({}, {field: 1}, sort=[(field, -1)])
+        # Read from collection metadata; counting would scan every document
+        count = await db[collection].estimated_document_count()
+        last_modified = latest.get(field) if latest else None
+        # A deleted document leaves no timestamp behind but its tombstone
+        deleted_at = await latest_delete(db, collection)
+        if deleted_at and (last_modified is None or deleted_at > last_modified):
+            last_modified = deleted_at
+        return Watermark(last_modified, count)
+
+    return await public_cache.get_or_load((collection, "watermark"), load)
+
+
+async def combined_watermark(parts: List[tuple]) -> tuple:
+    """Watermark and ETag variant for a response built from several collections.
+
+    ``parts`` holds ``(collection, variant)`` pairs. The variant embeds every
+    part's ETag, so it changes whenever any of the collections does.
+    """
+    watermarks = await asyncio.gather(*(get_watermark(collection) for collection, _ in parts))
+    variant = ";".join(
+        make_etag(collection, watermark, part_variant)
+        for (collection, part_variant), watermark in zip(parts, watermarks)
+    )
+    modified = [watermark.last_modified for watermark in watermarks if watermark.last_modified]
+    return Watermark(max(modified) if modified else None, len(parts)), variant
+
+
+def field_projection(fields: Optional[str], model, sort_field: str) -> Optional[dict]:
+    """Turn a ``fields`` parameter into a projection, rejecting unknown fields.
+
+    The sort key is always projected so cursors can be built from the result.
+    """
+    try:
+        return build_projection(fields, model, required=(sort_field,))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+def parse_object_id(value: str, detail: str) -> ObjectId:
+    """Parse an id from the path, answering 404 with ``detail`` before any query if malformed."""
+    if not ObjectId.is_valid(value):
+        raise HTTPException(status_code=404, detail=detail)
+    return ObjectId(value)
+
+
+def page_filter(sort_field: str, direction: int, after: Optional[str]) -> dict:
+    """Turn an ``after`` cursor into a keyset filter, rejecting bad cursors."""
+    if not after:
+        return {}
+    try:
+        return keyset_filter(sort_field, direction, after)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def load_page(
+    collection: str,
+    model,
+    sort_field: str,
+    direction: int,
+    query: dict,
+    projection: Optional[dict],
+    limit: int,
+    after: Optional[str],
+):
+    """Load one keyset page of a public collection through the cache.
+
+    Returns the items and the cursor of the following page, if any.
+    """
+    async def load():
+        docs = await db[collection].find(query, projection).sort(
+            [(sort_field, direction), ("_id", direction)]
+        ).limit(limit + 1).to_list(limit + 1)
+        next_cursor = encode_cursor(docs[limit - 1], sort_field) if len(docs) > limit else None
+        return construct_all(model, docs[:limit]), next_cursor
+
+    return await public_cache.get_or_load(
+        (collection, "page", limit, after, projection_key(projection)), load
+    )
+
+
+async def load_list(
+    collection: str,
+    model,
+    sort_field: str,
+    direction: int,
+    projection: Optional[dict],
+):
+    """Load a short, unpaginated public collection through the cache."""
+    async def load():
+        docs = await db[collection].find({}, projection).sort(sort_field, direction).to_list(100)
+        return construct_all(model, docs)
+
+    return await public_cache.get_or_load((collection, projection_key(projection)), load)
+
+
+async def load_settings() -> dict:
+    """Load the public site settings through the cache."""
+    async def load():
+        settings = await db.site_settings.find_one()
+        if not settings:
+            # Return default values if no settings exist
+            return SiteSettings().dict()
+        return {
+            "active_members": settings.get("active_members", 50),
+            "total_events": settings.get("total_events", 20),
+            "lives_impacted": settings.get("lives_impacted", 1000),
+            "awards_won": settings.get("awards_won", 5)
+        }
+
+    return await public_cache.get_or_load(("site_settings",), load)
+
+
+async def cached_json_response(
+    request: Request, response: Response, key: tuple, load, cache: TTLCache = public_cache
+) -> Response:
+    """Serve a public payload from its serialized form in ``cache``.
+
+    ``load`` returns the payload and any headers that belong with it. The
+    payload is serialized once per cache entry, and each compressed variant
+    is produced on first request and kept on the entry too.
+    """
+    async def render():
+        payload, headers = await load()
+        return EncodedBody(render_json(payload), headers)
+
+    encoded = await cache.get_or_load(key, render)
+    return await encoded.response(request, response)
+
+
+# Snapshot of each public collection: the default response of its list route
+async def first_page(resource: Resource):
+    """What the list route of ``resource`` returns without parameters."""
+    if not resource.paginated:
+        return await load_list(resource.collection, resource.model, resource.sort_field, resource.direction, None)
+    items, _ = await load_page(
+        resource.collection, resource.model, resource.sort_field, resource.direction,
+        {}, None, DEFAULT_PAGE_SIZE, None,
+    )
+    return items
+
+
+snapshots = SnapshotStore(SNAPSHOT_DIR, {
+    **{resource.collection: partial(first_page, resource) for resource in RESOURCES},
+    "settings": load_settings,
+})
+
+# Public list routes that can be answered from a snapshot while Mongo is down
+SNAPSHOT_ROUTES = {
+    **{f"/api{resource.path}": resource.collection for resource in RESOURCES},
+    "/api/settings": "settings",
+}
+
+
+def invalidate_collection(collection: str) -> None:
+    """Drop this worker's cached reads of ``collection``."""
+    public_cache.invalidate(collection)
+
+
+def publish_change(collection: str, change: Optional[tuple]) -> None:
+    """Push one ``(op, id, fields)`` change to /api/stream subscribers.
+
+    ``None`` means the collection changed in an unknown way, which clients
+    are told with a ``reset`` for that collection.
+    """
+    if change is None:
+        broadcaster.publish("reset", {"reason": "changed", "collection": collection}, collection)
+        return
+    op, doc_id, fields = change
+    if fields is not None:
+        fields = {k: v for k, v in fields.items() if k != "_id"}
+    broadcaster.publish(
+        "change",
+        {"collection": collection, "op": op, "id": doc_id, "fields": fields},
+        collection,
+    )
+
+
+def content_changed(collection: str, changes: List[tuple]) -> None:
+    """Propagate admin writes to everything derived from ``collection``.
+
+    ``changes`` holds an ``(op, id, fields)`` triple per written document.
+    They are published here unless a change stream is reporting every
+    write; polling then leaves them out and only resets for other workers'.
+    """
+    invalidate_collection(collection)
+    snapshots.schedule("settings" if collection == "site_settings" else collection)
+    if content_watcher.mode != "watch":
+        for change in changes:
+            publish_change(collection, change)
+        content_watcher.published(collection, changes)
+
+
+def collection_changed(collection: str, change: Optional[tuple]) -> None:
+    """Watcher callback for a write made through any worker."""
+    invalidate_collection(collection)
+    publish_change(collection, change)
+
+
+# Every worker's writes reach this worker's cache and stream through the watcher
+content_watcher = ContentWatcher(db, WATERMARK_FIELDS, collection_changed)
+stats_gauges("content_watcher", "Cross-worker cache invalidation", content_watcher.stats)
+
+
+async def bulk_changes(resource: Resource, request_data: BulkRequest) -> BulkResponse:
+    """Apply a bulk request to a public collection and propagate the changes once."""
+    collection = resource.collection
+    result, changes = await apply_bulk(db[collection], request_data.operations, resource)
+    if changes:
+        await record_deletes(db, collection, [doc_id for op, doc_id, _ in changes if op == "delete"])
+        content_changed(collection, changes)
+    return result
 
 
 # ==================== AUTHENTICATION ROUTES ====================
@@ -73,7 +374,7 @@ async def register(user_data: UserCreate):
         )
     
     # Hash password and create user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     user_dict = {
         "email": user_data.email,
         "password": hashed_password,
@@ -82,7 +383,14 @@ async def register(user_data: UserCreate):
         "created_at": datetime.utcnow()
     }
     
-    result = await db.users.insert_one(user_dict)
+    try:
+        result = await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        # Lost a race against a concurrent registration (unique email index)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     user_dict["_id"] = str(result.inserted_id)
     
     return {"message": "User created successfully", "user": User(**user_dict)}
@@ -92,7 +400,7 @@ async def register(user_data: UserCreate):
 async def login(credentials: UserLogin):
     """Login and get JWT token."""
     user = await db.users.find_one({"email": credentials.email})
-    if not user or not verify_password(credentials.password, user["password"]):
+    if not user or not await password_hasher.verify(credentials.password, user["password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -114,330 +422,292 @@ async def login(credentials: UserLogin):
 @api_router.get("/auth/me")
 async def get_me(current_user: dict = Depends(get_current_user)):
     """Get current user info."""
-    user = await db.users.find_one({"_id": ObjectId(current_user["id"])})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    return {
-        "id": str(user["_id"]),
-        "email": user["email"],
-        "name": user["name"],
-        "role": user.get("role", "admin")
-    }
-
-
-# ==================== BOARD MEMBERS ROUTES ====================
-
-@api_router.get("/board-members", response_model=List[BoardMember])
-async def get_board_members():
-    """Get all board members (public)."""
-    members = await db.board_members.find().sort("order", 1).to_list(100)
-    return [BoardMember(**doc_to_dict(member)) for member in members]
-
+    async def load():
+        user = await db.users.find_one(
+            {"_id": ObjectId(current_user["id"])}, {"email": 1, "name": 1, "role": 1}
+        )
+        if not user:
+            return None
+        return {
+            "id": str(user["_id"]),
+            "email": user["email"],
+            "name": user["name"],
+            "role": user.get("role", "admin")
+        }
 
-@api_router.post("/board-members", response_model=BoardMember)
-async def create_board_member(
-    member_data: BoardMemberCreate,
-    current_user: dict = Depends(get_current_user)
-):
-    """Create a new board member (admin only)."""
-    member_dict = member_data.dict()
-    member_dict["created_at"] = datetime.utcnow()
-    member_dict["updated_at"] = datetime.utcnow()
-    
-    result = await db.board_members.insert_one(member_dict)
-    member_dict["_id"] = str(result.inserted_id)
+    profile = await profile_cache.get_or_load(("users", current_user["id"]), load)
+    if not profile:
+        raise HTTPException(status_code=404, detail="User not found")
     
-    return BoardMember(**member_dict)
+    return profile
+
+
+# ==================== CONTENT ROUTES ====================
+
+async def list_response(
+    resource: Resource,
+    request: Request,
+    response: Response,
+    fields: Optional[str],
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+) -> Response:
+    """Serve a public list of ``resource``, honouring conditional headers."""
+    collection = resource.collection
+    query = page_filter(resource.sort_field, resource.direction, after) if resource.paginated else {}
+    projection = field_projection(fields or resource.default_fields, resource.model, resource.sort_field)
+    if resource.paginated:
+        variant = f"{limit}:{after}:{projection_key(projection)}"
+    else:
+        variant = projection_key(projection)
+    watermark = await get_watermark(collection)
+    not_modified = conditional_response(request, response, collection, watermark, variant=variant)
+    if not_modified:
+        return not_modified
+
+    item_model = resource.partial_model if projection else resource.model
+
+    async def load():
+        if not resource.paginated:
+            return await load_list(
+                collection, item_model, resource.sort_field, resource.direction, projection
+            ), None
+        items, next_cursor = await load_page(
+            collection, item_model, resource.sort_field, resource.direction, query, projection, limit, after
+        )
+        return items, {"X-Next-Cursor": next_cursor} if next_cursor else None
+
+    return await cached_json_response(request, response, (collection, "json", variant), load)
+
+
+def add_resource_routes(router: APIRouter, resource: Resource) -> None:
+    """Register the public reads and admin writes of ``resource`` on ``router``."""
+    collection = resource.collection
+    label = resource.label
+    not_found = f"{label} not found"
+    plural = label.lower() + "s"
+    article = "an" if label[0].lower() in "aeiou" else "a"
+    item_path = f"{resource.path}/{{{resource.id_param}}}"
+    # The handlers take ``item_id``; the path and the docs use ``id_param``
+    item_id_param = PathParam(alias=resource.id_param)
+    model = resource.model
+    read_projection = model_projection(model)
+
+    if resource.paginated:
+        async def list_items(
+            request: Request,
+            response: Response,
+            limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+            after: Optional[str] = None,
+            fields: Optional[str] = None,
+        ):
+            return await list_response(resource, request, response, fields, limit, after)
+
+        order = "newest" if resource.direction < 0 else "oldest"
+        list_description = f"Get a page of {plural}, {order} first (public)."
+    else:
+        async def list_items(request: Request, response: Response, fields: Optional[str] = None):
+            return await list_response(resource, request, response, fields)
 
+        list_description = f"Get all {plural} (public)."
 
-@api_router.put("/board-members/{member_id}", response_model=BoardMember)
-async def update_board_member(
-    member_id: str,
-    member_data: BoardMemberUpdate,
-    current_user: dict = Depends(get_current_user)
-):
-    """Update a board member (admin only)."""
-    update_data = {k: v for k, v in member_data.dict().items() if v is not None}
-    update_data["updated_at"] = datetime.utcnow()
-    
-    result = await db.board_members.find_one_and_update(
-        {"_id": ObjectId(member_id)},
-        {"$set": update_data},
-        return_document=True
+    router.add_api_route(
+        resource.path, list_items, methods=["GET"],
+        response_model=List[resource.partial_model], response_model_exclude_none=True,
+        name=f"get_{collection}", description=list_description,
     )
-    
-    if not result:
-        raise HTTPException(status_code=404, detail="Board member not found")
-    
-    return BoardMember(**doc_to_dict(result))
-
-
-@api_router.delete("/board-members/{member_id}")
-async def delete_board_member(
-    member_id: str,
-    current_user: dict = Depends(get_current_user)
-):
-    """Delete a board member (admin only)."""
-    result = await db.board_members.delete_one({"_id": ObjectId(member_id)})
-    
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Board member not found")
-    
-    return {"message": "Board member deleted successfully"}
-
-
-# ==================== PAST EVENTS ROUTES ====================
-
-@api_router.get("/events/past", response_model=List[PastEvent])
-async def get_past_events():
-    """Get all past events (public)."""
-    events = await db.past_events.find().sort("date", -1).to_list(100)
-    return [PastEvent(**doc_to_dict(event)) for event in events]
-
-
-@api_router.post("/events/past", response_model=PastEvent)
-async def create_past_event(
-    event_data: PastEventCreate,
-    current_user: dict = Depends(get_current_user)
-):
-    """Create a new past event (admin only)."""
-    event_dict = event_data.dict()
-    event_dict["created_at"] = datetime.utcnow()
-    event_dict["updated_at"] = datetime.utcnow()
-    
-    result = await db.past_events.insert_one(event_dict)
-    event_dict["_id"] = str(result.inserted_id)
-    
-    return PastEvent(**event_dict)
 
+    if resource.detail:
+        async def get_item(request: Request, response: Response, item_id: str = item_id_param):
+            oid = parse_object_id(item_id, not_found)
+            watermark = await get_watermark(collection)
+            not_modified = conditional_response(request, response, collection, watermark, variant=item_id)
+            if not_modified:
+                return not_modified
+
+            async def load():
+                doc = await db[collection].find_one({"_id": oid})
+                if not doc:
+                    raise HTTPException(status_code=404, detail=not_found)
+                return construct(model, doc), None
+
+            return await cached_json_response(request, response, (collection, "detail", item_id), load)
+
+        router.add_api_route(
+            item_path, get_item, methods=["GET"], response_model=model,
+            name=f"get_{resource.item_name}",
+            description=f"Get a single {label.lower()} with its full content (public).",
+        )
 
-@api_router.put("/events/past/{event_id}", response_model=PastEvent)
-async def update_past_event(
-    event_id: str,
-    event_data: PastEventUpdate,
-    current_user: dict = Depends(get_current_user)
-):
-    """Update a past event (admin only)."""
-    update_data = {k: v for k, v in event_data.dict().items() if v is not None}
-    update_data["updated_at"] = datetime.utcnow()
-    
-    result = await db.past_events.find_one_and_update(
-        {"_id": ObjectId(event_id)},
-        {"$set": update_data},
-        return_document=True
+    async def create_item(
+        data: resource.create_model,
+        current_user: dict = Depends(get_current_user)
+    ):
+        doc = new_document(resource, data)
+        result = await db[collection].insert_one(doc)
+        doc["_id"] = str(result.inserted_id)
+        content_changed(collection, [("create", doc["_id"], doc)])
+        return model(**doc)
+
+    router.add_api_route(
+        resource.path, create_item, methods=["POST"], response_model=model,
+        name=f"create_{resource.write_name}",
+        description=f"{resource.create_verb} a new {label.lower()} (admin only).",
     )
-    
-    if not result:
-        raise HTTPException(status_code=404, detail="Past event not found")
-    
-    return PastEvent(**doc_to_dict(result))
-
-
-@api_router.delete("/events/past/{event_id}")
-async def delete_past_event(
-    event_id: str,
-    current_user: dict = Depends(get_current_user)
-):
-    """Delete a past event (admin only)."""
-    result = await db.past_events.delete_one({"_id": ObjectId(event_id)})
-    
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Past event not found")
-    
-    return {"message": "Past event deleted successfully"}
-
-
-# ==================== UPCOMING EVENTS ROUTES ====================
-
-@api_router.get("/events/upcoming", response_model=List[UpcomingEvent])
-async def get_upcoming_events():
-    """Get all upcoming events (public)."""
-    events = await db.upcoming_events.find().sort("date", 1).to_list(100)
-    return [UpcomingEvent(**doc_to_dict(event)) for event in events]
-
-
-@api_router.post("/events/upcoming", response_model=UpcomingEvent)
-async def create_upcoming_event(
-    event_data: UpcomingEventCreate,
-    current_user: dict = Depends(get_current_user)
-):
-    """Create a new upcoming event (admin only)."""
-    event_dict = event_data.dict()
-    event_dict["created_at"] = datetime.utcnow()
-    event_dict["updated_at"] = datetime.utcnow()
-    
-    result = await db.upcoming_events.insert_one(event_dict)
-    event_dict["_id"] = str(result.inserted_id)
-    
-    return UpcomingEvent(**event_dict)
 
+    if resource.update_model is not None:
+        async def update_item(
+            data: resource.update_model,
+            item_id: str = item_id_param,
+            current_user: dict = Depends(get_current_user)
+        ):
+            oid = parse_object_id(item_id, not_found)
+            update_data = update_fields(data)
+            query = changed_filter(oid, update_data)
+            result = None
+            if query is not None:
+                result = await db[collection].find_one_and_update(
+                    query,
+                    {"$set": update_data},
+                    projection=read_projection,
+                    return_document=ReturnDocument.AFTER,
+                )
+            if result is None:
+                # Missing, or already as requested: nothing was written or needs invalidating
+                result = await db[collection].find_one({"_id": oid}, read_projection)
+                if not result:
+                    raise HTTPException(status_code=404, detail=not_found)
+                return construct(model, result)
+
+            content_changed(collection, [("update", item_id, update_data)])
+            return construct(model, result)
+
+        router.add_api_route(
+            item_path, update_item, methods=["PUT"], response_model=model,
+            name=f"update_{resource.write_name}",
+            description=f"Update {article} {label.lower()} (admin only).",
+        )
 
-@api_router.put("/events/upcoming/{event_id}", response_model=UpcomingEvent)
-async def update_upcoming_event(
-    event_id: str,
-    event_data: UpcomingEventUpdate,
-    current_user: dict = Depends(get_current_user)
-):
-    """Update an upcoming event (admin only)."""
-    update_data = {k: v for k, v in event_data.dict().items() if v is not None}
-    update_data["updated_at"] = datetime.utcnow()
-    
-    result = await db.upcoming_events.find_one_and_update(
-        {"_id": ObjectId(event_id)},
-        {"$set": update_data},
-        return_document=True
+    async def delete_item(
+        item_id: str = item_id_param,
+        current_user: dict = Depends(get_current_user)
+    ):
+        result = await db[collection].delete_one({"_id": parse_object_id(item_id, not_found)})
+        if result.deleted_count == 0:
+            raise HTTPException(status_code=404, detail=not_found)
+
+        await record_deletes(db, collection, [item_id])
+        content_changed(collection, [("delete", item_id, None)])
+        return {"message": f"{label} deleted successfully"}
+
+    router.add_api_route(
+        item_path, delete_item, methods=["DELETE"],
+        name=f"delete_{resource.write_name}",
+        description=f"Delete {article} {label.lower()} (admin only).",
     )
-    
-    if not result:
-        raise HTTPException(status_code=404, detail="Upcoming event not found")
-    
-    return UpcomingEvent(**doc_to_dict(result))
-
-
-@api_router.delete("/events/upcoming/{event_id}")
-async def delete_upcoming_event(
-    event_id: str,
-    current_user: dict = Depends(get_current_user)
-):
-    """Delete an upcoming event (admin only)."""
-    result = await db.upcoming_events.delete_one({"_id": ObjectId(event_id)})
-    
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Upcoming event not found")
-    
-    return {"message": "Upcoming event deleted successfully"}
-
 
-# ==================== NEWS ROUTES ====================
+    async def bulk_items(
+        request_data: BulkRequest,
+        current_user: dict = Depends(get_current_user)
+    ):
+        return await bulk_changes(resource, request_data)
+
+    verbs = "Create, update and delete" if resource.update_model is not None else "Add and delete"
+    router.add_api_route(
+        f"{resource.path}/bulk", bulk_items, methods=["POST"],
+        response_model=BulkResponse, response_model_exclude_none=True,
+        name=f"bulk_{collection}", description=f"{verbs} {plural} in one request (admin only).",
+    )
 
-@api_router.get("/news", response_model=List[NewsArticle])
-async def get_news():
-    """Get all news articles (public)."""
-    articles = await db.news.find().sort("date", -1).to_list(100)
-    return [NewsArticle(**doc_to_dict(article)) for article in articles]
 
+for content_resource in RESOURCES:
+    add_resource_routes(api_router, content_resource)
 
-@api_router.post("/news", response_model=NewsArticle)
-async def create_news(
-    article_data: NewsArticleCreate,
-    current_user: dict = Depends(get_current_user)
-):
-    """Create a new news article (admin only)."""
-    article_dict = article_data.dict()
-    article_dict["created_at"] = datetime.utcnow()
-    article_dict["updated_at"] = datetime.utcnow()
-    
-    result = await db.news.insert_one(article_dict)
-    article_dict["_id"] = str(result.inserted_id)
-    
-    return NewsArticle(**article_dict)
 
+# ==================== CONTACT ROUTES ====================
 
-@api_router.put("/news/{article_id}", response_model=NewsArticle)
-async def update_news(
-    article_id: str,
-    article_data: NewsArticleUpdate,
-    current_user: dict = Depends(get_current_user)
-):
-    """Update a news article (admin only)."""
-    update_data = {k: v for k, v in article_data.dict().items() if v is not None}
-    update_data["updated_at"] = datetime.utcnow()
-    
-    result = await db.news.find_one_and_update(
-        {"_id": ObjectId(article_id)},
-        {"$set": update_data},
-        return_document=True
-    )
+@api_router.post("/contact/submit", status_code=status.HTTP_202_ACCEPTED)
+async def submit_contact(contact_data: ContactSubmit, request: Request):
+    """Submit a contact form (public)."""
+    # Queued for the admin to review; written to the database in batches
+    contact_dict = contact_data.dict()
+    contact_dict["created_at"] = datetime.utcnow()
+    contact_dict["status"] = "new"
     
-    if not result:
-        raise HTTPException(status_code=404, detail="News article not found")
+    contact_intake.submit(contact_dict, client_address(request))
     
-    return NewsArticle(**doc_to_dict(result))
+    return {"message": "Thank you for contacting us. We'll get back to you soon."}
 
 
-@api_router.delete("/news/{article_id}")
-async def delete_news(
-    article_id: str,
+@api_router.get("/contact/submissions", response_model=List[ContactSubmission])
+async def list_contact_submissions(
+    response: Response,
+    status_filter: Optional[str] = Query(None, alias="status", pattern="^(new|read|replied|archived)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Delete a news article (admin only)."""
-    result = await db.news.delete_one({"_id": ObjectId(article_id)})
-    
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="News article not found")
-    
-    return {"message": "News article deleted successfully"}
-
-
-# ==================== GALLERY ROUTES ====================
-
-@api_router.get("/gallery", response_model=List[GalleryImage])
-async def get_gallery():
-    """Get all gallery images (public)."""
-    images = await db.gallery.find().sort("created_at", -1).to_list(100)
-    return [GalleryImage(**doc_to_dict(image)) for image in images]
-
-
-@api_router.post("/gallery", response_model=GalleryImage)
-async def create_gallery_image(
-    image_data: GalleryImageCreate,
+    """Get a page of contact submissions, newest first (admin only)."""
+    query = inbox.inbox_filter(status_filter, since, until)
+    cursor_filter = page_filter("created_at", -1, after)
+    if cursor_filter:
+        query = {"$and": [query, cursor_filter]} if query else cursor_filter
+
+    docs = await db.contact_submissions.find(query).sort(
+        [("created_at", -1), ("_id", -1)]
+    ).limit(limit + 1).to_list(limit + 1)
+    if len(docs) > limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(docs[limit - 1], "created_at")
+    return construct_all(ContactSubmission, docs[:limit])
+
+
+@api_router.get("/contact/submissions/counts")
+async def get_contact_counts(current_user: dict = Depends(get_current_user)):
+    """Get the number of submissions in each status, and unread (admin only)."""
+    return await inbox.get_counts(db)
+
+
+@api_router.put("/contact/submissions/{submission_id}/status", response_model=ContactSubmission)
+async def update_contact_status(
+    submission_id: str,
+    status_data: ContactStatusUpdate,
     current_user: dict = Depends(get_current_user)
 ):
-    """Add a new gallery image (admin only)."""
-    image_dict = image_data.dict()
-    image_dict["created_at"] = datetime.utcnow()
-    
-    result = await db.gallery.insert_one(image_dict)
-    image_dict["_id"] = str(result.inserted_id)
-    
-    return GalleryImage(**image_dict)
+    """Change the status of a contact submission (admin only)."""
+    submission_oid = parse_object_id(submission_id, "Submission not found")
+    submission = await inbox.set_status(db, submission_oid, status_data.status)
+    return construct(ContactSubmission, submission)
 
 
-@api_router.delete("/gallery/{image_id}")
-async def delete_gallery_image(
-    image_id: str,
+@api_router.post("/contact/submissions/archive")
+async def archive_contact_submissions(
+    archive_data: ContactArchiveRequest,
     current_user: dict = Depends(get_current_user)
 ):
-    """Delete a gallery image (admin only)."""
-    result = await db.gallery.delete_one({"_id": ObjectId(image_id)})
-    
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Gallery image not found")
-    
-    return {"message": "Gallery image deleted successfully"}
-
-
-# ==================== CONTACT ROUTES ====================
-
-@api_router.post("/contact/submit")
-async def submit_contact(contact_data: ContactSubmit):
-    """Submit a contact form (public)."""
-    # Store in database for admin to review
-    contact_dict = contact_data.dict()
-    contact_dict["created_at"] = datetime.utcnow()
-    contact_dict["status"] = "new"
-    
-    await db.contact_submissions.insert_one(contact_dict)
-    
-    return {"message": "Thank you for contacting us. We'll get back to you soon."}
+    """Archive several contact submissions at once (admin only)."""
+    invalid = [item for item in archive_data.ids if not ObjectId.is_valid(item)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid id: {', '.join(invalid)}")
+    archived = await inbox.archive_many(db, [ObjectId(item) for item in archive_data.ids])
+    return {"archived": archived}
 
 
 # ==================== SITE SETTINGS ROUTES ====================
 
 @api_router.get("/settings")
-async def get_settings():
+async def get_settings(request: Request, response: Response):
     """Get site settings (public)."""
-    settings = await db.site_settings.find_one()
-    if not settings:
-        # Return default values if no settings exist
-        return SiteSettings().dict()
-    return {
-        "active_members": settings.get("active_members", 50),
-        "total_events": settings.get("total_events", 20),
-        "lives_impacted": settings.get("lives_impacted", 1000),
-        "awards_won": settings.get("awards_won", 5)
-    }
+    watermark = await get_watermark("site_settings")
+    not_modified = conditional_response(request, response, "site_settings", watermark)
+    if not_modified:
+        return not_modified
+
+    async def load():
+        return await load_settings(), None
+
+    return await cached_json_response(request, response, ("site_settings", "json"), load)
 
 
 @api_router.put("/settings")
@@ -460,6 +730,8 @@ async def update_settings(
     else:
         await db.site_settings.insert_one(update_data)
     
+    # Settings are a single document, so changes carry no id
+    content_changed("site_settings", [("update", None, update_data)])
     return {"message": "Settings updated successfully"}
 
 
@@ -503,9 +775,178 @@ async def seed_database():
             image["created_at"] = datetime.utcnow()
         await db.gallery.insert_many(GALLERY_IMAGES_SEED)
     
+    public_cache.clear()
+    snapshots.schedule_all()
+    broadcaster.publish("reset", {"reason": "seeded"})
     return {"message": "Database seeded successfully"}
 
 
+# ==================== BUNDLE ROUTES ====================
+
+# List sections the bundle can include; "settings" is served as well
+BUNDLE_LISTS = {resource.collection: resource for resource in RESOURCES}
+
+
+@api_router.get("/bundle", response_model=Dict[str, Any], response_model_exclude_none=True)
+async def get_bundle(
+    request: Request,
+    response: Response,
+    sections: str = Query(..., description="Comma separated section names"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    """Get several public collections in one response (public).
+
+    ``sections`` picks from board_members, past_events, upcoming_events, news,
+    gallery and settings. ``limit`` caps every list, and ``<section>.fields``
+    selects fields the same way ``fields`` does on the list routes. The
+    sections are loaded concurrently from the public cache.
+    """
+    names = list(dict.fromkeys(name.strip() for name in sections.split(",") if name.strip()))
+    unknown = [name for name in names if name != "settings" and name not in BUNDLE_LISTS]
+    if not names or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown bundle section: {', '.join(unknown)}" if unknown else "No sections requested"
+        )
+
+    projections = {
+        name: field_projection(
+            request.query_params.get(f"{name}.fields") or BUNDLE_LISTS[name].default_fields,
+            BUNDLE_LISTS[name].model,
+            BUNDLE_LISTS[name].sort_field,
+        )
+        for name in names if name in BUNDLE_LISTS
+    }
+    combined, sections_variant = await combined_watermark([
+        (BUNDLE_LISTS[name].collection if name in BUNDLE_LISTS else "site_settings",
+         projection_key(projections.get(name)))
+        for name in names
+    ])
+    variant = f"{limit}:{sections_variant}"
+    not_modified = conditional_response(request, response, "bundle", combined, variant=variant)
+    if not_modified:
+        return not_modified
+
+    async def load_section(name: str):
+        if name == "settings":
+            return await load_settings()
+        spec = BUNDLE_LISTS[name]
+        projection = projections[name]
+        model = spec.partial_model if projection else spec.model
+        if spec.paginated:
+            items, _ = await load_page(
+                spec.collection, model, spec.sort_field, spec.direction, {}, projection, limit, None
+            )
+            return items
+        items = await load_list(spec.collection, model, spec.sort_field, spec.direction, projection)
+        return items[:limit]
+
+    async def load():
+        results = await asyncio.gather(*(load_section(name) for name in names))
+        return dict(zip(names, results)), None
+
+    # The variant embeds every section's ETag, so an entry is never served stale
+    return await cached_json_response(request, response, ("bundle", "json", variant), load)
+
+
+# ==================== SEARCH ROUTES ====================
+
+@api_router.get("/search", response_model=List[SearchResult])
+async def search(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(20, ge=1, le=50),
+    after: Optional[str] = None,
+):
+    """Search news, events and gallery captions, best match first (public).
+
+    Matching words in each ``snippet`` are wrapped in ``<mark>`` tags; the
+    rest of the snippet is HTML-escaped.
+    """
+    q = " ".join(q.split())
+    try:
+        offset = decode_offset_cursor(after) if after else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if offset >= MAX_SEARCH_DEPTH:
+        return []
+
+    combined, sources_variant = await combined_watermark(
+        [(source.collection, "") for source in SEARCH_SOURCES]
+    )
+    variant = f"{q.lower()}:{limit}:{offset}:{sources_variant}"
+    not_modified = conditional_response(request, response, "search", combined, variant=variant)
+    if not_modified:
+        return not_modified
+
+    async def load():
+        results, has_more = await run_search(db, q, offset, limit)
+        return results, {"X-Next-Cursor": encode_offset_cursor(offset + limit)} if has_more else None
+
+    return await cached_json_response(request, response, ("search", "json", variant), load, search_cache)
+
+
+# ==================== SYNC ROUTES ====================
+
+SYNC_SOURCES = tuple(
+    SyncSource(resource.collection, resource.model, resource.timestamp_field) for resource in RESOURCES
+)
+
+
+@api_router.get("/sync")
+async def sync_content(
+    since: Optional[str] = Query(None, description="Token from the previous sync"),
+    limit: int = Query(DEFAULT_SYNC_LIMIT, ge=1, le=MAX_SYNC_LIMIT, description="Documents per collection"),
+):
+    """Public content written or deleted since the client's last sync.
+
+    Without ``since``, or when it is too old to know what was deleted, every
+    document is returned with ``reset: true``. Changes come in pages of at
+    most ``limit`` per collection; while ``more`` is true the client asks
+    again with the returned token. The settings are small and always included.
+    """
+    try:
+        payload = await load_changes(db, SYNC_SOURCES, since, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+    payload["settings"] = await load_settings()
+    return Response(render_json(payload), media_type="application/json", headers={"Cache-Control": "no-store"})
+
+
+# ==================== STREAM ROUTES ====================
+
+@api_router.get("/stream")
+async def stream_changes(
+    request: Request,
+    collections: Optional[str] = Query(None, description="Comma separated collections to follow"),
+    last_event_id: Optional[str] = Query(None, description="Resume point for clients that cannot send Last-Event-ID"),
+):
+    """Server-Sent Events feed of admin writes to the public collections.
+
+    Each ``change`` event carries the collection, op, document id and the
+    fields that were written. A ``reset`` event means the client should
+    refetch everything. Reconnecting with ``Last-Event-ID`` replays what was
+    missed from this worker's recent history.
+    """
+    wanted = None
+    if collections:
+        wanted = {name.strip() for name in collections.split(",") if name.strip()}
+        unknown = sorted(wanted - WATERMARK_FIELDS.keys())
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown collection: {', '.join(unknown)}",
+            )
+    resume_from = request.headers.get("last-event-id") or last_event_id
+    return StreamingResponse(
+        broadcaster.stream(resume_from, wanted),
+        media_type="text/event-stream",
+        # Keep proxies from buffering or caching the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ==================== UPLOAD ROUTES ====================
 
 @api_router.post("/upload")
@@ -514,22 +955,9 @@ async def upload_file(
     current_user: dict = Depends(get_current_user)
 ):
     """Upload an image file (admin only)."""
-    # Validate file type
-    allowed_types = ["image/jpeg", "image/jpg", "image/png", "image/gif", "image/webp"]
-    if file.content_type not in allowed_types:
-        raise HTTPException(
-            status_code=400,
-            detail="Only image files (JPEG, PNG, GIF, WebP) are allowed"
-        )
-    
-    # Generate unique filename
-    file_ext = file.filename.split(".")[-1]
-    unique_filename = f"{uuid.uuid4()}.{file_ext}"
-    file_path = UPLOAD_DIR / unique_filename
-    
-    # Save file
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    file_path = await save_upload(file, UPLOAD_DIR)
+    unique_filename = file_path.name
+    image_derivatives.warm(unique_filename)
     
     # Return URL
     backend_url = os.environ.get('REACT_APP_BACKEND_URL', 'http://localhost:8001')
@@ -538,6 +966,21 @@ async def upload_file(
     return {"url": file_url, "filename": unique_filename}
 
 
+@api_router.get("/images/{filename}")
+async def get_image_derivative(filename: str, w: int = Query(640, ge=1)):
+    """Serve a resized WebP variant of an uploaded image (public)."""
+    path = await image_derivatives.get(filename, w)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    # Uploads are stored by content hash, so a file name always means the same bytes
+    return FileResponse(
+        path,
+        media_type="image/webp",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
 def convert_google_drive_link(link: str) -> str:
     """Convert Google Drive link to direct image URL."""
     if "drive.google.com" in link:
@@ -563,6 +1006,32 @@ async def root():
 # Include the router in the main app
 app.include_router(api_router)
 
+
+# ==================== METRICS ROUTE ====================
+
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus metrics for this worker process."""
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+# Refuse oversized uploads before the multipart body is parsed
+app.add_middleware(UploadSizeLimitMiddleware, path="/api/upload", max_bytes=MAX_UPLOAD_BYTES)
+
+# Brotli or gzip for larger text responses; cached public payloads arrive
+# already compressed and pass through
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.environ.get('COMPRESSION_MIN_BYTES', '1000')),
+)
+
+# Outermost but for CORS, so timings cover compression too
+app.add_middleware(MetricsMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -570,6 +1039,7 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Configure logging
@@ -579,6 +1049,56 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_indexes():
+    await ensure_indexes(db)
+    await inbox.ensure_counters(db)
+
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    loop_monitor.start()
+
+
+@app.on_event("startup")
+async def start_contact_intake():
+    contact_intake.start()
+
+
+@app.on_event("startup")
+async def start_content_watcher():
+    content_watcher.start()
+
+
+@app.on_event("startup")
+async def build_snapshots():
+    # Runs in the background; previous snapshots stay in place if Mongo is down
+    snapshots.schedule_all()
+
+
+@app.exception_handler(PyMongoError)
+async def database_unavailable(request: Request, exc: PyMongoError):
+    """Serve public reads from the snapshots when MongoDB cannot be reached."""
+    logger.error("Database error on %s %s: %s", request.method, request.url.path, exc)
+    name = SNAPSHOT_ROUTES.get(request.url.path)
+    body = snapshots.read(name) if name and request.method == "GET" and not request.url.query else None
+    if body is None:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Service temporarily unavailable"},
+        )
+    return Response(
+        body,
+        media_type="application/json",
+        headers={"Cache-Control": "no-cache", "X-Served-From": "snapshot"},
+    )
+
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    loop_monitor.stop()
+    await contact_intake.stop()
+    await content_watcher.stop()
+    client.close()
+    password_hasher.shutdown()
+    image_derivatives.shutdown()
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""Pre-rendered JSON snapshots of the public collections.
+
+Each collection is written to ``<name>.<version>.json`` (plus ``.gz`` and,
+when the brotli package is installed, ``.br`` siblings), where the version is
+a hash of the content. ``manifest.json`` points at the current version of
+every collection, and ``<name>.json`` always holds the latest body. The
+directory can be served by a CDN or web server as is, and the API falls back
+to it when MongoDB is unreachable.
+"""
+import asyncio
+import fcntl
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.staticfiles import StaticFiles
+
+from serialization import render_json
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+
+logger = logging.getLogger(__name__)
+
+# Old versions kept next to the current one, for clients mid-fetch
+KEEP_VERSIONS = 3
+
+# Writes arriving within this window are folded into one rebuild
+DEBOUNCE_SECONDS = 0.5
+
+VERSIONED_NAME = re.compile(r"^\w+\.[0-9a-f]{16}\.json$")
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # Every worker builds snapshots, so each write needs its own temp file
+    fd, temp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            os.fchmod(handle.fileno(), 0o644)
+            handle.write(data)
+        os.replace(temp, path)
+    except BaseException:
+        Path(temp).unlink(missing_ok=True)
+        raise
+
+
+class SnapshotStore:
+    """Builds snapshot files and rebuilds them as collections change."""
+
+    def __init__(self, directory: Path, sources: Dict[str, Callable[[], Awaitable[Any]]]):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.sources = sources
+        self._dirty: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def _write_files(self, name: str, body: bytes) -> dict:
+        version = hashlib.sha256(body).hexdigest()[:16]
+        filename = f"{name}.{version}.json"
+        target = self.directory / filename
+        if target.exists():
+            # Content went back to an earlier version; mark it current for pruning
+            os.utime(target)
+        else:
+            _write_atomic(target.with_name(filename + ".gz"), gzip.compress(body, 9))
+            if brotli is not None:
+                _write_atomic(target.with_name(filename + ".br"), brotli.compress(body))
+            _write_atomic(target, body)
+
+        # <name>.json and its compressed siblings mirror the current version
+        for suffix in ("", ".gz", ".br"):
+            source = self.directory / (filename + suffix)
+            if source.exists():
+                _write_atomic(self.directory / f"{name}.json{suffix}", source.read_bytes())
+
+        # Prune versions beyond the newest few
+        versions = sorted(
+            self.directory.glob(f"{name}.*.json"),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True,
+        )
+        for old in versions[KEEP_VERSIONS:]:
+            for path in (old, old.with_name(old.name + ".gz"), old.with_name(old.name + ".br")):
+                path.unlink(missing_ok=True)
+
+        return {
+            "version": version,
+            "file": filename,
+            "bytes": len(body),
+            "generated_at": datetime.utcnow().isoformat(),
+        }
+
+    def _update_manifest(self, entries: Dict[str, dict]) -> None:
+        manifest_path = self.directory / "manifest.json"
+        # Held across the read-modify-write so workers do not drop each other's entries
+        with open(self.directory / ".manifest.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                manifest = json.loads(manifest_path.read_bytes())
+            except (FileNotFoundError, ValueError):
+                manifest = {}
+            manifest.update(entries)
+            _write_atomic(manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode())
+
+    async def build(self, names=None) -> None:
+        """Rebuild the snapshots of ``names`` (default: every collection)."""
+        entries = {}
+        for name in names or self.sources:
+            body = render_json(await self.sources[name]())
+            entries[name] = await run_in_threadpool(self._write_files, name, body)
+        await run_in_threadpool(self._update_manifest, entries)
+
+    def schedule(self, name: str) -> None:
+        """Queue an incremental rebuild of one collection's snapshot."""
+        self._dirty.add(name)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._rebuild_dirty())
+
+    def schedule_all(self) -> None:
+        for name in self.sources:
+            self.schedule(name)
+
+    async def _rebuild_dirty(self) -> None:
+        while self._dirty:
+            await asyncio.sleep(DEBOUNCE_SECONDS)
+            names, self._dirty = self._dirty, set()
+            try:
+                await self.build(names)
+            except Exception:
+                logger.exception("Snapshot rebuild failed for %s", ", ".join(sorted(names)))
+
+    def read(self, name: str) -> Optional[bytes]:
+        """Latest snapshot body of a collection, if one has been written."""
+        try:
+            return (self.directory / f"{name}.json").read_bytes()
+        except FileNotFoundError:
+            return None
+
+
+class SnapshotStaticFiles(StaticFiles):
+    """Serves snapshot files, preferring the precompressed variants."""
+
+    async def get_response(self, path: str, scope):
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        if path.endswith(".json"):
+            for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+                if encoding not in accept_encoding:
+                    continue
+                try:
+                    response = await super().get_response(path + suffix, scope)
+                except HTTPException:
+                    continue
+                response.headers["Content-Type"] = "application/json"
+                response.headers["Content-Encoding"] = encoding
+                response.headers["Vary"] = "Accept-Encoding"
+                return self._cache_headers(path, response)
+        response = await super().get_response(path, scope)
+        return self._cache_headers(path, response)
+
+    @staticmethod
+    def _cache_headers(path: str, response):
+        # Versioned files never change; the manifest and latest copies do
+        if VERSIONED_NAME.match(os.path.basename(path)):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
@@ -0,0 +1,201 @@
+"""Change feed for clients that keep a local copy of the public content.
+
+A sync token marks the point in time a client is up to date with. Each
+collection is asked for the documents written after it, and the
+``tombstones`` collection, which the delete handlers write to, for the ids
+removed after it. Tombstones expire after ``SYNC_TOMBSTONE_DAYS``; a client
+without a token, or with one older than that, gets everything again.
+
+Both are walked in ``(timestamp, _id)`` order, at most ``limit`` per
+collection at a time. When there is more, the token returned carries where
+each collection stopped, and the client asks again with it until ``more``
+is false.
+"""
+import asyncio
+import base64
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from pagination import encode_cursor, keyset_filter
+from serialization import construct_all
+
+
+TOMBSTONE_DAYS = int(os.environ.get("SYNC_TOMBSTONE_DAYS", "30"))
+
+# Handlers stamp a write just before it commits, so a token reaches back this
+# far; documents written near the boundary may be sent twice
+SYNC_OVERLAP = timedelta(seconds=5)
+
+DEFAULT_SYNC_LIMIT = 500
+MAX_SYNC_LIMIT = 1000
+
+
+class SyncSource(NamedTuple):
+    collection: str
+    model: Type[BaseModel]
+    # Set on every write to the collection
+    timestamp_field: str
+
+
+class SyncToken(NamedTuple):
+    # Changes after this are sent; None while paging through a full copy
+    since: Optional[datetime]
+    # Set on the pages after the first: when the sync started, and the
+    # cursor of each collection, and each collection's tombstones, with more
+    started: Optional[datetime] = None
+    written: Optional[Dict[str, str]] = None
+    deleted: Optional[Dict[str, str]] = None
+
+
+def encode_sync_token(
+    since: Optional[datetime],
+    started: Optional[datetime] = None,
+    written: Optional[Dict[str, str]] = None,
+    deleted: Optional[Dict[str, str]] = None,
+) -> str:
+    data = {"since": since.isoformat() if since else None}
+    if started is not None:
+        data.update(started=started.isoformat(), written=written or {}, deleted=deleted or {})
+    raw = json.dumps(data, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> SyncToken:
+    """Decode a token from ``encode_sync_token``, raising ``ValueError`` if bad."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        since = datetime.fromisoformat(data["since"]) if data["since"] is not None else None
+        if "started" not in data:
+            if since is None:
+                raise ValueError("Token without a starting point")
+            return SyncToken(since)
+        written, deleted = data["written"], data["deleted"]
+        if not isinstance(written, dict) or not isinstance(deleted, dict):
+            raise ValueError("Malformed cursors")
+        return SyncToken(since, datetime.fromisoformat(data["started"]), written, deleted)
+    except (ValueError, TypeError, KeyError) as exc:
+        raise ValueError("Invalid sync token") from exc
+
+
+def sync_sort(timestamp_field: str) -> List[Tuple[str, int]]:
+    return [(timestamp_field, 1), ("_id", 1)]
+
+
+def written_filter(timestamp_field: str, since: Optional[datetime], cursor: Optional[str]) -> dict:
+    """Documents written after ``since``, or after ``cursor`` on later pages."""
+    if cursor:
+        return keyset_filter(timestamp_field, 1, cursor)
+    return {timestamp_field: {"$gt": since}} if since else {}
+
+
+def deleted_filter(collection: str, since: datetime, cursor: Optional[str]) -> dict:
+    """Tombstones left in ``collection`` after ``since``, or after ``cursor``."""
+    if cursor:
+        return {"collection": collection, **keyset_filter("deleted_at", 1, cursor)}
+    return {"collection": collection, "deleted_at": {"$gt": since}}
+
+
+async def record_deletes(db, collection: str, ids: Iterable[str]) -> None:
+    """Leave a tombstone for each deleted document."""
+    now = datetime.utcnow()
+    tombstones = [{"collection": collection, "doc_id": doc_id, "deleted_at": now} for doc_id in ids]
+    if tombstones:
+        await db.tombstones.insert_many(tombstones)
+
+
+async def latest_delete(db, collection: str) -> Optional[datetime]:
+    """When a document was last deleted from ``collection``, if within retention."""
+    tombstone = await db.tombstones.find_one(
+        {"collection": collection}, {"deleted_at": 1}, sort=[("deleted_at", -1)]
+    )
+    return tombstone["deleted_at"] if tombstone else None
+
+
+async def _written_page(
+    db, source: SyncSource, since: Optional[datetime], cursor: Optional[str], limit: int
+) -> Tuple[list, Optional[str]]:
+    field = source.timestamp_field
+    docs = await db[source.collection].find(written_filter(field, since, cursor)).sort(
+        sync_sort(field)
+    ).limit(limit + 1).to_list(limit + 1)
+    next_cursor = encode_cursor(docs[limit - 1], field) if len(docs) > limit else None
+    return construct_all(source.model, docs[:limit]), next_cursor
+
+
+async def _deleted_page(
+    db, source: SyncSource, since: datetime, cursor: Optional[str], limit: int
+) -> Tuple[List[str], Optional[str]]:
+    tombstones = await db.tombstones.find(
+        deleted_filter(source.collection, since, cursor), {"doc_id": 1, "deleted_at": 1}
+    ).sort(sync_sort("deleted_at")).limit(limit + 1).to_list(limit + 1)
+    next_cursor = encode_cursor(tombstones[limit - 1], "deleted_at") if len(tombstones) > limit else None
+    return list(dict.fromkeys(doc["doc_id"] for doc in tombstones[:limit])), next_cursor
+
+
+async def load_changes(
+    db, sources: Tuple[SyncSource, ...], token: Optional[str], limit: int = DEFAULT_SYNC_LIMIT
+) -> dict:
+    """One page of the documents written and ids deleted in each source since ``token``.
+
+    Raises ``ValueError`` for a malformed token. ``reset`` is true on the
+    first page when the client has to replace its copy rather than apply the
+    changes to it; later pages are always applied. ``more`` is true until
+    the last page.
+    """
+    now = datetime.utcnow()
+    position = decode_sync_token(token) if token else SyncToken(None)
+    since, started = position.since, position.started
+    reset = False
+    if started is not None:
+        written_from, deleted_from = position.written, position.deleted
+    else:
+        started = now
+        reset = since is None or since < now - timedelta(days=TOMBSTONE_DAYS)
+        if reset:
+            since = None
+        written_from = {source.collection: None for source in sources}
+        deleted_from = {} if reset else dict(written_from)
+
+    written_sources = [source for source in sources if source.collection in written_from]
+    deleted_sources = [source for source in sources if source.collection in deleted_from]
+    written, deleted = await asyncio.gather(
+        asyncio.gather(*(
+            _written_page(db, source, since, written_from[source.collection], limit)
+            for source in written_sources
+        )),
+        asyncio.gather(*(
+            _deleted_page(db, source, since, deleted_from[source.collection], limit)
+            for source in deleted_sources
+        )),
+    )
+
+    changes = {source.collection: [] for source in sources}
+    removed = {source.collection: [] for source in sources}
+    more_written, more_deleted = {}, {}
+    for source, (docs, cursor) in zip(written_sources, written):
+        changes[source.collection] = docs
+        if cursor:
+            more_written[source.collection] = cursor
+    for source, (ids, cursor) in zip(deleted_sources, deleted):
+        removed[source.collection] = ids
+        if cursor:
+            more_deleted[source.collection] = cursor
+
+    more = bool(more_written or more_deleted)
+    if more:
+        next_token = encode_sync_token(since, started, more_written, more_deleted)
+    else:
+        # Writes made while the pages were fetched are sent by the next sync
+        next_token = encode_sync_token(started - SYNC_OVERLAP)
+    return {
+        "token": next_token,
+        "reset": reset,
+        "more": more,
+        "changes": changes,
+        "deleted": removed,
+    }
@@ -0,0 +1,282 @@
+"""Upload storage.
+
+Uploaded images are stored under the SHA-256 of their content, so the same
+photo uploaded twice is kept once and its URL never changes meaning. Files
+are referenced by URL from the content collections; ``python uploads.py gc``
+deletes the ones nothing refers to any more.
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.staticfiles import StaticFiles
+
+
+MAX_UPLOAD_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+CHUNK_SIZE = 1024 * 1024
+
+# Room for the multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+TOO_LARGE_DETAIL = "File is too large"
+
+# Content-addressed names: first 32 hex digits of the SHA-256, plus extension
+HASHED_NAME = re.compile(r"^[0-9a-f]{32}\.(jpg|png|gif|webp)$")
+
+# Fields holding upload URLs, per collection
+REFERENCE_FIELDS: Dict[str, List[str]] = {
+    "gallery": ["url"],
+    "past_events": ["images"],
+    "news": ["image"],
+    "board_members": ["image"],
+}
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Return the file extension for the image format in ``head``, if allowed."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def _write_chunk(buffer, digest, chunk: bytes) -> None:
+    digest.update(chunk)
+    buffer.write(chunk)
+
+
+def _discard(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"{TOO_LARGE_DETAIL} (limit {max_bytes // (1024 * 1024)} MB)",
+    )
+
+
+async def save_upload(
+    file: UploadFile,
+    directory: Path,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+) -> Path:
+    """Stream an uploaded image into ``directory`` without blocking the loop.
+
+    The format is taken from the file's magic bytes, never from the client's
+    filename or content type. Data is written in fixed-size chunks to a
+    temporary file which is renamed into place only once complete, so a
+    failed or oversized upload never leaves a partial file behind. The final
+    name is derived from the content hash; if that file already exists the
+    new copy is dropped and the existing one reused.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    head = await file.read(12)
+    extension = sniff_image_type(head)
+    if extension is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Only image files (JPEG, PNG, GIF, WebP) are allowed"
+        )
+
+    digest = hashlib.sha256()
+    fd, temp_path = await run_in_threadpool(
+        tempfile.mkstemp, dir=directory, prefix=".upload-", suffix=".part"
+    )
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            size = len(head)
+            await run_in_threadpool(_write_chunk, buffer, digest, head)
+            while True:
+                chunk = await file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _too_large(max_bytes)
+                await run_in_threadpool(_write_chunk, buffer, digest, chunk)
+            await run_in_threadpool(buffer.flush)
+            await run_in_threadpool(os.fsync, buffer.fileno())
+
+        final_path = directory / f"{digest.hexdigest()[:32]}.{extension}"
+        if final_path.exists():
+            await run_in_threadpool(_discard, temp_path)
+            # Refresh the mtime so garbage collection's grace period covers the reuse
+            await run_in_threadpool(os.utime, final_path)
+        else:
+            await run_in_threadpool(os.replace, temp_path, final_path)
+    except BaseException:
+        await run_in_threadpool(_discard, temp_path)
+        raise
+
+    return final_path
+
+
+class UploadStaticFiles(StaticFiles):
+    """Static files mount that marks content-addressed uploads as immutable."""
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if HASHED_NAME.match(os.path.basename(full_path)):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+class UploadSizeLimitMiddleware:
+    """Reject oversized request bodies on an upload path before they are parsed.
+
+    A declared Content-Length over the limit is answered with 413 straight
+    away. Bodies without one are counted as they stream in.
+    """
+
+    def __init__(self, app, path: str, max_bytes: int = MAX_UPLOAD_BYTES):
+        self.app = app
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_body = max_bytes + MULTIPART_OVERHEAD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body:
+            response = JSONResponse(
+                {"detail": _too_large(self.max_bytes).detail},
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body:
+                    # Surfaces through FastAPI's exception handling as a 413
+                    raise _too_large(self.max_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def upload_filename(url: str) -> Optional[str]:
+    """Name of the uploaded file a URL points at, if it is one of ours."""
+    if not isinstance(url, str) or "/uploads/" not in url:
+        return None
+    filename = url.rpartition("/uploads/")[2].split("?")[0]
+    return filename if filename and "/" not in filename else None
+
+
+async def referenced_uploads(db) -> Set[str]:
+    """Collect every upload file name referenced by the content collections."""
+    referenced = set()
+    for collection, fields in REFERENCE_FIELDS.items():
+        projection = {field: 1 for field in fields}
+        async for doc in db[collection].find({}, projection):
+            for field in fields:
+                values = doc.get(field)
+                for url in values if isinstance(values, list) else [values]:
+                    filename = upload_filename(url)
+                    if filename:
+                        referenced.add(filename)
+    return referenced
+
+
+def _file_digest(path: Path) -> str:
+    if HASHED_NAME.match(path.name):
+        return path.stem
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+async def collect_garbage(db, directory: Path, grace_seconds: float, dry_run: bool = False) -> List[Path]:
+    """Delete uploads no document references, and their derived variants.
+
+    Files younger than ``grace_seconds`` are kept, since an admin may have
+    uploaded them and not yet saved the document that refers to them.
+    Returns the removed (or, with ``dry_run``, removable) paths.
+    """
+    referenced = await referenced_uploads(db)
+    cutoff = time.time() - grace_seconds
+
+    removed = []
+    kept_digests = set()
+    for path in directory.iterdir():
+        if not path.is_file() or path.name.startswith("."):
+            continue
+        if path.name in referenced or path.stat().st_mtime > cutoff:
+            kept_digests.add(_file_digest(path))
+            continue
+        removed.append(path)
+
+    # Variants are named <source digest>-<width>.webp
+    derived_dir = directory / ".derived"
+    if derived_dir.is_dir():
+        for path in derived_dir.iterdir():
+            if path.suffix == ".webp" and path.name.split("-")[0] not in kept_digests:
+                removed.append(path)
+
+    if not dry_run:
+        for path in removed:
+            _discard(str(path))
+    return removed
+
+
+async def main() -> int:
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(description="Maintain the uploads directory.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    gc = commands.add_parser("gc", help="delete uploads that no document references")
+    gc.add_argument("--dir", default="/app/uploads", type=Path)
+    gc.add_argument("--grace-hours", default=24.0, type=float,
+                    help="keep unreferenced files younger than this (default 24)")
+    gc.add_argument("--dry-run", action="store_true", help="only list what would be deleted")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        removed = await collect_garbage(
+            client[os.environ['DB_NAME']], args.dir, args.grace_hours * 3600, args.dry_run
+        )
+    finally:
+        client.close()
+
+    for path in removed:
+        print(f"{'Would remove' if args.dry_run else 'Removed'} {path}")
+    print(f"{len(removed)} orphaned file(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
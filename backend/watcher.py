@@ -0,0 +1,222 @@
+"""Keeps each worker's in-process caches and live feed in step with the database.
+
+Every uvicorn worker (and every replica) runs its own watcher. On a replica
+set it tails a change stream over the public collections, so an edit made
+through any worker reaches the caches and /api/stream clients of all of
+them within milliseconds. A standalone mongod has no change streams; there
+the watcher polls each collection's document count and newest timestamp
+instead, which tells that a collection changed but not how.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+
+logger = logging.getLogger(__name__)
+
+# "auto" tries a change stream and falls back to polling; "watch", "poll"
+# and "off" force one behaviour
+WATCH_MODE = os.environ.get("CONTENT_WATCH_MODE", "auto")
+POLL_INTERVAL = float(os.environ.get("CONTENT_POLL_SECONDS", "2"))
+
+# Change stream operation types reported as an (op, id, fields) change
+OPERATIONS = {"insert": "create", "replace": "update", "update": "update", "delete": "delete"}
+
+# Server error codes meaning change streams are unsupported on this deployment
+UNSUPPORTED_CODES = {40573, 40324}
+CHANGE_STREAM_HISTORY_LOST = 286
+
+MAX_BACKOFF = 30.0
+
+
+def describe_change(change: dict) -> Optional[Tuple[str, object, Optional[dict]]]:
+    """The ``(op, id, fields)`` triple of a change stream event.
+
+    The id is a string, as the API sends it. ``fields`` is the whole document
+    for inserts and replacements, the updated fields for updates and ``None``
+    for deletes. Returns ``None`` for events that do not concern a single
+    document.
+    """
+    op = OPERATIONS.get(change["operationType"])
+    if op is None:
+        return None
+    doc_id = str(change["documentKey"]["_id"])
+    if op == "delete":
+        fields = None
+    elif change["operationType"] == "update":
+        fields = change.get("updateDescription", {}).get("updatedFields", {})
+    else:
+        fields = change.get("fullDocument")
+    return op, doc_id, fields
+
+
+class ContentWatcher:
+    """Calls ``on_change(collection, change)`` whenever a watched collection changes.
+
+    ``change`` is the ``(op, id, fields)`` triple of the written document, or
+    ``None`` when only the collection is known to have changed: when polling,
+    and after the change stream had to start over.
+
+    ``fields`` maps each watched collection to the timestamp field that every
+    write to it sets, which is what the polling fallback compares. Changes a
+    worker published itself are passed to ``published`` so that polling does
+    not report them again.
+    """
+
+    def __init__(self, db, fields: Dict[str, str], on_change: Callable[[str, Optional[tuple]], None]):
+        self.db = db
+        self.fields = fields
+        self.on_change = on_change
+        self.mode: Optional[str] = None
+        self.events = 0
+        self.reconnects = 0
+        self._task: Optional[asyncio.Task] = None
+        # Per collection, the net count change and the timestamps of writes
+        # published by this worker since the last poll
+        self._published: Dict[str, Tuple[int, Set[datetime]]] = {}
+
+    def start(self) -> None:
+        if WATCH_MODE != "off":
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def _changed(self, collection: str, change: Optional[tuple] = None) -> None:
+        self.events += 1
+        try:
+            self.on_change(collection, change)
+        except Exception:
+            logger.exception("Change handler failed for %s", collection)
+
+    def _changed_all(self) -> None:
+        # Events may have been missed; assume everything changed
+        for collection in self.fields:
+            self._changed(collection)
+
+    async def _run(self) -> None:
+        try:
+            # In-memory stand-ins used for benchmarks have no watch() at all;
+            # look on the class since attribute access on a database names a collection
+            if WATCH_MODE in ("auto", "watch") and callable(getattr(type(self.db), "watch", None)):
+                try:
+                    await self._watch()
+                    return
+                except (OperationFailure, NotImplementedError) as exc:
+                    if WATCH_MODE == "watch":
+                        logger.error("Change stream unavailable, caches rely on their TTL: %s", exc)
+                        return
+                    logger.info("Change streams unavailable (%s); polling every %ss", exc, POLL_INTERVAL)
+            await self._poll()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Content watcher stopped; caches rely on their TTL")
+            self.mode = None
+
+    async def _watch(self) -> None:
+        pipeline = [{"$match": {"ns.coll": {"$in": list(self.fields)}}}]
+        resume_token = None
+        backoff = 1.0
+        while True:
+            try:
+                async with self.db.watch(pipeline, resume_after=resume_token) as stream:
+                    if self.mode is None:
+                        logger.info("Watching %s for changes", ", ".join(self.fields))
+                    elif resume_token is None:
+                        self._changed_all()
+                    self.mode = "watch"
+                    backoff = 1.0
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        described = describe_change(change)
+                        if described is None:
+                            # drop, rename, dropDatabase or invalidate
+                            self._changed_all()
+                            continue
+                        self._changed(change["ns"]["coll"], described)
+            except OperationFailure as exc:
+                if self.mode is None and exc.code in UNSUPPORTED_CODES:
+                    raise
+                if exc.code == CHANGE_STREAM_HISTORY_LOST:
+                    # Too far behind to resume; start over from now
+                    resume_token = None
+                logger.warning("Change stream failed, reconnecting in %.0fs: %s", backoff, exc)
+            except PyMongoError as exc:
+                logger.warning("Change stream interrupted, reconnecting in %.0fs: %s", backoff, exc)
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+    def published(self, collection: str, changes: Iterable[tuple]) -> None:
+        """Note ``(op, id, fields)`` changes this worker has already published.
+
+        Only polling needs this; a change stream reports every write itself.
+        """
+        if self.mode != "poll" or collection not in self.fields:
+            return
+        field = self.fields[collection]
+        delta, timestamps = self._published.get(collection, (0, set()))
+        for op, _, fields in changes:
+            delta += {"create": 1, "delete": -1}.get(op, 0)
+            timestamp = (fields or {}).get(field)
+            if isinstance(timestamp, datetime):
+                # MongoDB keeps milliseconds
+                timestamps.add(timestamp.replace(microsecond=timestamp.microsecond // 1000 * 1000))
+        self._published[collection] = (delta, timestamps)
+
+    async def _state(self, collection: str, field: str) -> Tuple[int, object]:
+        latest = await self.db[collection].find_one({}, {field: 1}, sort=[(field, -1)])
+        count = await self.db[collection].estimated_document_count()
+        return count, latest.get(field) if latest else None
+
+    async def _explained(
+        self, collection: str, field: str, previous: Tuple[int, object], state: Tuple[int, object],
+        published: Tuple[int, Set[datetime]],
+    ) -> bool:
+        """Whether the writes published by this worker account for the change."""
+        delta, timestamps = published
+        if state[0] != previous[0] + delta:
+            return False
+        newer = {"$nin": list(timestamps)}
+        if previous[1] is not None:
+            newer["$gt"] = previous[1]
+        return await self.db[collection].find_one({field: newer}, {"_id": 1}) is None
+
+    async def _poll(self) -> None:
+        self.mode = "poll"
+        last: Dict[str, Tuple[int, object]] = {}
+        while True:
+            for collection, field in self.fields.items():
+                # Taken before reading, so every write noted here is already visible
+                published = self._published.pop(collection, None)
+                try:
+                    state = await self._state(collection, field)
+                    previous = last.get(collection)
+                    changed = previous is not None and state != previous and not (
+                        published and await self._explained(collection, field, previous, state, published)
+                    )
+                except PyMongoError as exc:
+                    logger.warning("Could not poll %s: %s", collection, exc)
+                    continue
+                if changed:
+                    self._changed(collection)
+                last[collection] = state
+            await asyncio.sleep(POLL_INTERVAL)
+
+    def stats(self) -> dict:
+        return {
+            "watching": 1 if self.mode == "watch" else 0,
+            "polling": 1 if self.mode == "poll" else 0,
+            "events_total": self.events,
+            "reconnects_total": self.reconnects,
+        }
@@ -44,9 +44,13 @@ export const Contact = () => {
         message: ''
       });
     } catch (error) {
+      // 429 and 503 carry a message asking the visitor to retry later
+      const status = error.response?.status;
       toast({
         title: "Error",
-        description: "Failed to send message. Please try again.",
+        description: (status === 429 || status === 503) && error.response.data?.detail
+          ? error.response.data.detail
+          : "Failed to send message. Please try again.",
         variant: "destructive"
       });
     } finally {
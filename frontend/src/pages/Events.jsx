@@ -58,6 +58,9 @@ export const Events = () => {
                       <div key={index} className="aspect-video overflow-hidden rounded-lg">
                         <img
                           src={image}
+                          srcSet={event.image_srcsets?.[index] || undefined}
+                          sizes="(min-width: 768px) 50vw, 100vw"
+                          loading="lazy"
                           alt={`${event.title} - Image ${index + 1}`}
                           className="w-full h-full object-cover hover:scale-105 transition-transform duration-300"
                         />
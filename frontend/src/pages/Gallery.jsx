@@ -56,6 +56,9 @@ export const Gallery = () => {
               >
                 <img
                   src={image.url}
+                  srcSet={image.srcset || undefined}
+                  sizes="(min-width: 1024px) 33vw, (min-width: 640px) 50vw, 100vw"
+                  loading="lazy"
                   alt={image.caption}
                   className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-300"
                 />
@@ -3,7 +3,7 @@ import { Link } from 'react-router-dom';
 import { ArrowRight, Users, Calendar, Heart, Award } from 'lucide-react';
 import { Button } from '../components/ui/button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '../components/ui/card';
-import { eventsAPI, newsAPI, settingsAPI } from '../services/api';
+import { bundleAPI } from '../services/api';
 
 export const Home = () => {
   const [upcomingEvents, setUpcomingEvents] = useState([]);
@@ -19,14 +19,13 @@ export const Home = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [eventsResponse, newsResponse, statsResponse] = await Promise.all([
-          eventsAPI.getUpcoming(),
-          newsAPI.getAll(),
-          settingsAPI.get()
-        ]);
-        setUpcomingEvents(eventsResponse.data);
-        setNewsArticles(newsResponse.data);
-        setStats(statsResponse.data);
+        const response = await bundleAPI.get(['upcoming_events', 'news', 'settings'], {
+          limit: 3,
+          'news.fields': 'title,date,excerpt,image',
+        });
+        setUpcomingEvents(response.data.upcoming_events);
+        setNewsArticles(response.data.news);
+        setStats(response.data.settings);
       } catch (error) {
         console.error('Error fetching data:', error);
       } finally {
@@ -17,6 +17,14 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// Fetch one page of a paginated list. The cursor for the following page comes
+// back in the X-Next-Cursor header and is null on the last page.
+const getPage = (url, { limit, after, fields } = {}) =>
+  api.get(url, { params: { limit, after, fields } }).then((response) => ({
+    items: response.data,
+    nextCursor: response.headers['x-next-cursor'] || null,
+  }));
+
 // Auth API
 export const authAPI = {
   login: (email, password) => api.post('/auth/login', { email, password }),
@@ -30,11 +38,13 @@ export const boardAPI = {
   create: (data) => api.post('/board-members', data),
   update: (id, data) => api.put(`/board-members/${id}`, data),
   delete: (id) => api.delete(`/board-members/${id}`),
+  bulk: (operations) => api.post('/board-members/bulk', { operations }),
 };
 
 // Events API
 export const eventsAPI = {
   getPast: () => api.get('/events/past'),
+  getPastPage: (options) => getPage('/events/past', options),
   getUpcoming: () => api.get('/events/upcoming'),
   createPast: (data) => api.post('/events/past', data),
   createUpcoming: (data) => api.post('/events/upcoming', data),
@@ -42,26 +52,85 @@ export const eventsAPI = {
   updateUpcoming: (id, data) => api.put(`/events/upcoming/${id}`, data),
   deletePast: (id) => api.delete(`/events/past/${id}`),
   deleteUpcoming: (id) => api.delete(`/events/upcoming/${id}`),
+  bulkPast: (operations) => api.post('/events/past/bulk', { operations }),
+  bulkUpcoming: (operations) => api.post('/events/upcoming/bulk', { operations }),
 };
 
 // News API
 export const newsAPI = {
-  getAll: () => api.get('/news'),
+  getAll: (params) => api.get('/news', { params }),
+  getById: (id) => api.get(`/news/${id}`),
+  getPage: (options) => getPage('/news', options),
   create: (data) => api.post('/news', data),
   update: (id, data) => api.put(`/news/${id}`, data),
   delete: (id) => api.delete(`/news/${id}`),
+  bulk: (operations) => api.post('/news/bulk', { operations }),
 };
 
 // Gallery API
 export const galleryAPI = {
   getAll: () => api.get('/gallery'),
+  getPage: (options) => getPage('/gallery', options),
   create: (data) => api.post('/gallery', data),
   delete: (id) => api.delete(`/gallery/${id}`),
+  bulk: (operations) => api.post('/gallery/bulk', { operations }),
 };
 
 // Contact API
 export const contactAPI = {
   submit: (data) => api.post('/contact/submit', data),
+  // Admin inbox; `options` may carry status, since, until, limit and after
+  getSubmissions: ({ status, since, until, limit, after } = {}) =>
+    api.get('/contact/submissions', { params: { status, since, until, limit, after } })
+      .then((response) => ({
+        items: response.data,
+        nextCursor: response.headers['x-next-cursor'] || null,
+      })),
+  getCounts: () => api.get('/contact/submissions/counts'),
+  setStatus: (id, status) => api.put(`/contact/submissions/${id}/status`, { status }),
+  archive: (ids) => api.post('/contact/submissions/archive', { ids }),
+};
+
+// Bundle API: several public sections in a single request. `params` may
+// carry `limit` and per-section field selections such as `news.fields`.
+export const bundleAPI = {
+  get: (sections, params = {}) =>
+    api.get('/bundle', { params: { sections: sections.join(','), ...params } }),
+};
+
+// Search API: ranked matches across news, events and gallery captions.
+// Snippets contain <mark> tags around matching words and are otherwise escaped.
+export const searchAPI = {
+  search: (q, { limit, after } = {}) =>
+    api.get('/search', { params: { q, limit, after } }).then((response) => ({
+      results: response.data,
+      nextCursor: response.headers['x-next-cursor'] || null,
+    })),
+};
+
+// Delta sync: pass the token from the previous call to get only what changed.
+// When `reset` is true the client should replace its copy with `changes`
+// instead of merging them, and drop the ids listed in `deleted` otherwise.
+// While `more` is true, call again with the new token for the next page.
+export const syncAPI = {
+  sync: (since, limit) => api.get('/sync', { params: { since, limit } }),
+};
+
+// Live updates: `onChange` receives { collection, op, id, fields } for every
+// admin write, `onReset` fires when the client should refetch everything, or
+// only `collection` when the event names one.
+// EventSource reconnects by itself and resumes with Last-Event-ID.
+// Returns a function that closes the stream.
+export const subscribeToChanges = ({ onChange, onReset, collections } = {}) => {
+  const params = collections ? `?collections=${encodeURIComponent(collections.join(','))}` : '';
+  const source = new EventSource(`${API_BASE}/stream${params}`);
+  if (onChange) {
+    source.addEventListener('change', (event) => onChange(JSON.parse(event.data)));
+  }
+  if (onReset) {
+    source.addEventListener('reset', (event) => onReset(JSON.parse(event.data)));
+  }
+  return () => source.close();
 };
 
 // Settings API
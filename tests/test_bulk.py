@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from bulk import apply_bulk
+from models import BulkOperation
+from resources import RESOURCES
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+RESOURCE = {resource.collection: resource for resource in RESOURCES}
+ARTICLE = {"title": "Blood drive", "date": "2024-06-01", "excerpt": "Short", "content": "Body", "image": "a.jpg"}
+
+
+@pytest.fixture
+def db():
+    return mongomock_motor.AsyncMongoMockClient()["bulk_test"]
+
+
+def run(db, collection, *operations):
+    ops = [BulkOperation(**op) for op in operations]
+    return asyncio.run(apply_bulk(db[collection], ops, RESOURCE[collection]))
+
+
+def stored(db, collection):
+    return asyncio.run(db[collection].find({}).to_list(None))
+
+
+def insert(db, collection, doc):
+    return str(asyncio.run(db[collection].insert_one(dict(doc))).inserted_id)
+
+
+def statuses(response):
+    return [result.status for result in response.results]
+
+
+def test_valid_operations_are_applied_together(db):
+    kept = insert(db, "news", ARTICLE)
+    gone = insert(db, "news", ARTICLE)
+
+    response, changes = run(
+        db, "news",
+        {"op": "create", "data": ARTICLE},
+        {"op": "update", "id": kept, "data": {"title": "Renamed"}},
+        {"op": "delete", "id": gone},
+    )
+
+    assert statuses(response) == [201, 200, 200]
+    assert (response.created, response.updated, response.deleted, response.failed) == (1, 1, 1, 0)
+    docs = {str(doc["_id"]): doc for doc in stored(db, "news")}
+    assert gone not in docs and docs[kept]["title"] == "Renamed"
+    assert docs[response.results[0].id]["created_at"] == docs[response.results[0].id]["updated_at"]
+    assert [(op, item_id) for op, item_id, _ in changes] == [
+        ("create", response.results[0].id), ("update", kept), ("delete", gone),
+    ]
+    assert changes[1][2]["title"] == "Renamed" and "updated_at" in changes[1][2]
+    assert changes[2][2] is None
+
+
+def test_invalid_items_fail_without_stopping_the_others(db):
+    existing = insert(db, "news", ARTICLE)
+
+    response, changes = run(
+        db, "news",
+        {"op": "update", "data": {"title": "No id"}},
+        {"op": "delete", "id": "not-an-id"},
+        {"op": "delete", "id": str(ObjectId())},
+        {"op": "create", "data": {"title": "Missing fields"}},
+        {"op": "update", "id": existing, "data": {"title": "Renamed"}},
+    )
+
+    assert statuses(response) == [400, 400, 404, 422, 200]
+    assert response.results[3].error.split(":")[0] == "date"
+    assert (response.updated, response.failed) == (1, 4)
+    assert [(op, item_id) for op, item_id, _ in changes] == [("update", existing)]
+    assert len(stored(db, "news")) == 1
+
+
+def test_duplicate_ids_in_one_batch_apply_once(db):
+    existing = insert(db, "news", ARTICLE)
+
+    response, _ = run(
+        db, "news",
+        {"op": "update", "id": existing, "data": {"title": "First"}},
+        {"op": "delete", "id": existing},
+    )
+
+    assert statuses(response) == [200, 409]
+    assert stored(db, "news")[0]["title"] == "First"
+
+
+def test_duplicate_key_errors_are_reported_per_item(db):
+    asyncio.run(db.news.create_index("title", unique=True))
+    insert(db, "news", ARTICLE)
+
+    response, changes = run(
+        db, "news",
+        {"op": "create", "data": ARTICLE},
+        {"op": "create", "data": {**ARTICLE, "title": "Another"}},
+    )
+
+    assert statuses(response) == [409, 201]
+    assert (response.created, response.failed) == (1, 1)
+    assert [op for op, _, _ in changes] == ["create"]
+
+
+def test_gallery_updates_are_not_allowed(db):
+    image = insert(db, "gallery", {"url": "/uploads/a.jpg", "caption": "Before"})
+
+    response, _ = run(
+        db, "gallery",
+        {"op": "update", "id": image, "data": {"caption": "After"}},
+        {"op": "create", "data": {"url": "/uploads/b.jpg", "caption": "New"}},
+    )
+
+    assert statuses(response) == [405, 201]
+    assert {doc["caption"] for doc in stored(db, "gallery")} == {"Before", "New"}
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from cache import TTLCache
+
+
+def test_expired_entries_are_misses():
+    cache = TTLCache(ttl=60)
+    cache.set(("news", "a"), 1, ttl=0)
+    assert cache.get(("news", "a"), "missing") == "missing"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2)
+    cache.set(("news", 1), 1)
+    cache.set(("news", 2), 2)
+    cache.get(("news", 1))
+    cache.set(("news", 3), 3)
+    assert cache.get(("news", 2)) is None
+    assert cache.get(("news", 1)) == 1
+
+
+def test_concurrent_misses_share_one_load():
+    calls = 0
+
+    async def main():
+        cache = TTLCache()
+        release = asyncio.Event()
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "value"
+
+        tasks = [asyncio.create_task(cache.get_or_load(("news",), loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*tasks), cache
+
+    results, cache = asyncio.run(main())
+    assert results == ["value"] * 5
+    assert calls == 1
+    assert (cache.misses, cache.hits) == (1, 4)
+
+
+def test_invalidate_during_load_does_not_keep_stale_value():
+    async def main():
+        cache = TTLCache()
+        loading = asyncio.Event()
+        release = asyncio.Event()
+
+        async def loader():
+            loading.set()
+            await release.wait()
+            return "stale"
+
+        task = asyncio.create_task(cache.get_or_load(("news", "json"), loader))
+        await loading.wait()
+        cache.invalidate("news")
+        release.set()
+        assert await task == "stale"
+
+        async def fresh():
+            return "fresh"
+
+        return await cache.get_or_load(("news", "json"), fresh)
+
+    assert asyncio.run(main()) == "fresh"
+
+
+def test_invalidate_only_drops_its_collection():
+    cache = TTLCache()
+    cache.set(("news", "json"), 1)
+    cache.set(("gallery", "json"), 2)
+    cache.invalidate("news")
+    assert cache.get(("news", "json")) is None
+    assert cache.get(("gallery", "json")) == 2
+
+
+def test_failed_load_is_shared_and_not_cached():
+    async def main():
+        cache = TTLCache()
+
+        async def failing():
+            await asyncio.sleep(0)
+            raise RuntimeError("down")
+
+        results = await asyncio.gather(
+            cache.get_or_load(("news",), failing),
+            cache.get_or_load(("news",), failing),
+            return_exceptions=True,
+        )
+
+        async def working():
+            return "ok"
+
+        return results, await cache.get_or_load(("news",), working)
+
+    results, value = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert value == "ok"
+
+
+def test_loader_cancellation_does_not_leave_key_loading():
+    async def main():
+        cache = TTLCache()
+
+        async def slow():
+            await asyncio.sleep(10)
+
+        task = asyncio.create_task(cache.get_or_load(("news",), slow))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return cache._loading
+
+    assert asyncio.run(main()) == {}
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from starlette.requests import Request
+
+from conditional import Watermark, coded_etag, http_date, is_not_modified, make_etag
+
+
+def request_with(**headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+
+MODIFIED = datetime(2024, 5, 1, 12, 30, 15, 500000)
+ETAG = make_etag("news", Watermark(MODIFIED, 3), "page")
+
+
+def test_etag_changes_with_watermark_and_variant():
+    assert make_etag("news", Watermark(MODIFIED, 4), "page") != ETAG
+    assert make_etag("news", Watermark(MODIFIED, 3), "other") != ETAG
+    assert make_etag("news", Watermark(MODIFIED, 3), "page") == ETAG
+
+
+def test_matching_etag_is_not_modified():
+    assert is_not_modified(request_with(if_none_match=ETAG), ETAG, MODIFIED)
+    assert is_not_modified(request_with(if_none_match=f'"other", {ETAG}'), ETAG, MODIFIED)
+    assert is_not_modified(request_with(if_none_match="*"), ETAG, MODIFIED)
+
+
+def test_coded_and_weak_forms_match():
+    for encoding in ("gzip", "br"):
+        tag = coded_etag(ETAG, encoding)
+        assert tag != ETAG
+        assert is_not_modified(request_with(if_none_match=tag), ETAG, MODIFIED)
+        assert is_not_modified(request_with(if_none_match="W/" + tag), ETAG, MODIFIED)
+    assert coded_etag(ETAG, None) == ETAG
+
+
+def test_different_etag_is_modified():
+    assert not is_not_modified(request_with(if_none_match='"other"'), ETAG, MODIFIED)
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    request = request_with(if_none_match='"other"', if_modified_since=http_date(MODIFIED))
+    assert not is_not_modified(request, ETAG, MODIFIED)
+
+
+def test_if_modified_since_compares_whole_seconds():
+    assert is_not_modified(request_with(if_modified_since=http_date(MODIFIED)), ETAG, MODIFIED)
+    earlier = http_date(datetime(2024, 5, 1, 12, 30, 14))
+    assert not is_not_modified(request_with(if_modified_since=earlier), ETAG, MODIFIED)
+
+
+def test_unparseable_if_modified_since_is_modified():
+    assert not is_not_modified(request_with(if_modified_since="yesterday"), ETAG, MODIFIED)
+
+
+def test_no_validators_is_modified():
+    assert not is_not_modified(request_with(), ETAG, MODIFIED)
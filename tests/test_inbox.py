@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from inbox import archive_many, ensure_counters, get_counts, recount, record_new, set_status
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+@pytest.fixture
+def db():
+    return mongomock_motor.AsyncMongoMockClient()["inbox_test"]
+
+
+def seed(db, *statuses):
+    """Insert one submission per status and count them as the intake would."""
+    async def run():
+        result = await db.contact_submissions.insert_many(
+            [{"message": f"Message {i}", "status": status} for i, status in enumerate(statuses)]
+        )
+        await recount(db)
+        return result.inserted_ids
+
+    return asyncio.run(run())
+
+
+def counts(db):
+    return asyncio.run(get_counts(db))
+
+
+def assert_counters_match(db):
+    """The incremental counters agree with a full recount."""
+    kept = counts(db)
+    del kept["unread"]
+    assert kept == asyncio.run(recount(db))
+
+
+def test_counters_start_from_the_collection(db):
+    asyncio.run(db.contact_submissions.insert_many([{"status": "new"}, {"status": "read"}, {"status": "new"}]))
+    asyncio.run(ensure_counters(db))
+    asyncio.run(record_new(db, 2))
+
+    assert counts(db) == {"new": 4, "read": 1, "replied": 0, "archived": 0, "unread": 4}
+
+
+def test_set_status_moves_one_count(db):
+    first, _ = seed(db, "new", "new")
+
+    updated = asyncio.run(set_status(db, first, "read"))
+
+    assert updated["status"] == "read" and "status_changed_at" in updated
+    assert counts(db)["new"] == 1 and counts(db)["read"] == 1
+    assert_counters_match(db)
+
+
+def test_setting_the_same_status_changes_nothing(db):
+    (item,) = seed(db, "read")
+
+    asyncio.run(set_status(db, item, "read"))
+
+    assert counts(db)["read"] == 1
+    assert_counters_match(db)
+
+
+@pytest.mark.parametrize("old, new", [("archived", "new"), ("replied", "new")])
+def test_disallowed_transitions_are_refused(db, old, new):
+    (item,) = seed(db, old)
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(set_status(db, item, new))
+
+    assert raised.value.status_code == 409
+    assert counts(db)[old] == 1
+    assert_counters_match(db)
+
+
+def test_unknown_submission_is_404(db):
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(set_status(db, ObjectId(), "read"))
+    assert raised.value.status_code == 404
+
+
+def test_archive_many_adjusts_each_source_status(db):
+    ids = seed(db, "new", "new", "read", "replied", "archived", "new")
+
+    archived = asyncio.run(archive_many(db, ids[:5] + [ObjectId()]))
+
+    assert archived == 4
+    assert counts(db) == {"new": 1, "read": 0, "replied": 0, "archived": 5, "unread": 1}
+    assert_counters_match(db)
+
+
+def test_archive_many_twice_counts_once(db):
+    ids = seed(db, "new", "read")
+
+    asyncio.run(archive_many(db, ids))
+
+    assert asyncio.run(archive_many(db, ids)) == 0
+    assert counts(db)["archived"] == 2
+    assert_counters_match(db)
@@ -0,0 +1,161 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from pymongo.errors import AutoReconnect
+
+import intake as intake_module
+from intake import ContactIntake, TokenBucket
+
+
+class FlakyCollection:
+    """Stand-in collection whose first ``failures`` inserts fail."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.attempts = 0
+        self.docs = []
+        self.attempted = asyncio.Event()
+
+    async def insert_many(self, docs, ordered=True):
+        self.attempts += 1
+        self.attempted.set()
+        if self.attempts <= self.failures:
+            raise AutoReconnect("connection reset")
+        self.docs.extend(docs)
+
+
+def submission(i=0):
+    return {"name": "Visitor", "email": f"v{i}@example.com", "subject": "Hi", "message": f"Message {i}"}
+
+
+def test_stop_drains_the_queue():
+    async def run():
+        collection = FlakyCollection()
+        intake = ContactIntake(collection)
+        intake.start()
+        for i in range(3):
+            intake.submit(submission(i), f"10.0.0.{i}")
+        await intake.stop()
+        return collection, intake
+
+    collection, intake = asyncio.run(run())
+    assert len(collection.docs) == 3
+    assert intake.stats()["written_total"] == 3
+
+
+def test_stop_finishes_the_batch_being_retried():
+    async def run():
+        collection = FlakyCollection(failures=1)
+        intake = ContactIntake(collection)
+        intake.start()
+        intake.submit(submission(), "10.0.0.1")
+        # The first write has failed and the flusher is backing off
+        await collection.attempted.wait()
+        await intake.stop()
+        return collection, intake
+
+    collection, intake = asyncio.run(run())
+    assert collection.attempts == 2
+    assert len(collection.docs) == 1
+    assert intake.stats()["written_total"] == 1
+    assert intake.stats()["dropped_total"] == 0
+
+
+def test_stop_when_idle_returns():
+    async def run():
+        intake = ContactIntake(FlakyCollection())
+        intake.start()
+        await asyncio.sleep(0)
+        await asyncio.wait_for(intake.stop(), 1)
+
+    asyncio.run(run())
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(intake_module, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_bucket_allows_a_burst_then_refills(clock):
+    bucket = TokenBucket(rate_per_second=0.5, burst=2)
+    assert bucket.take("a") == 0 and bucket.take("a") == 0
+    assert bucket.take("a") == pytest.approx(2.0)
+
+    clock.value += 1
+    assert bucket.take("a") == pytest.approx(1.0)
+    clock.value += 1
+    assert bucket.take("a") == 0
+
+
+def test_bucket_keys_are_independent(clock):
+    bucket = TokenBucket(rate_per_second=0.5, burst=1)
+    assert bucket.take("a") == 0
+    assert bucket.take("a") > 0
+    assert bucket.take("b") == 0
+
+
+def test_rate_limited_submissions_get_429(clock):
+    async def run():
+        intake = ContactIntake(FlakyCollection())
+        intake.start()
+        for i in range(intake_module.BURST):
+            intake.submit(submission(i), "10.0.0.1")
+        with pytest.raises(HTTPException) as raised:
+            intake.submit(submission(99), "10.0.0.1")
+        intake.submit(submission(99), "10.0.0.2")
+        await intake.stop()
+        return intake, raised.value
+
+    intake, error = asyncio.run(run())
+    assert error.status_code == 429
+    assert int(error.headers["Retry-After"]) >= 1
+    assert intake.stats()["rate_limited_total"] == 1
+    assert intake.stats()["written_total"] == intake_module.BURST + 1
+
+
+def test_repeated_messages_are_acknowledged_but_stored_once():
+    async def run():
+        collection = FlakyCollection()
+        intake = ContactIntake(collection)
+        intake.start()
+        message = submission()
+        intake.submit(message, "10.0.0.1")
+        # Case and spacing do not make a message new
+        intake.submit({**message, "message": "  MESSAGE   0 "}, "10.0.0.2")
+        await intake.stop()
+        return collection, intake
+
+    collection, intake = asyncio.run(run())
+    assert len(collection.docs) == 1
+    assert intake.stats()["duplicates_total"] == 1
+    assert intake.stats()["accepted_total"] == 1
+
+
+def test_full_queue_answers_503_and_can_be_retried(monkeypatch):
+    monkeypatch.setattr(intake_module, "QUEUE_SIZE", 2)
+
+    async def run():
+        collection = FlakyCollection()
+        intake = ContactIntake(collection)
+        intake.start()
+        # The flusher cannot run until this coroutine yields
+        intake.submit(submission(0), "10.0.0.0")
+        intake.submit(submission(1), "10.0.0.1")
+        with pytest.raises(HTTPException) as raised:
+            intake.submit(submission(2), "10.0.0.2")
+        # A rejected message is not remembered as a duplicate
+        await asyncio.sleep(0)
+        intake.submit(submission(2), "10.0.0.3")
+        await intake.stop()
+        return collection, intake, raised.value
+
+    collection, intake, error = asyncio.run(run())
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "30"
+    assert intake.stats()["rejected_total"] == 1
+    assert intake.stats()["duplicates_total"] == 0
+    assert len(collection.docs) == 3
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from pagination import (
+    decode_cursor, decode_offset_cursor, encode_cursor, encode_offset_cursor, keyset_filter,
+)
+
+
+DOC_ID = ObjectId("65f000000000000000000001")
+
+
+@pytest.mark.parametrize("value", ["2024-05-01", datetime(2024, 5, 1, 12, 0, 0, 123000), 7, None])
+def test_cursor_round_trip(value):
+    cursor = encode_cursor({"_id": DOC_ID, "date": value}, "date")
+    assert decode_cursor(cursor) == (value, DOC_ID)
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor({"_id": DOC_ID, "date": "a/b+c?d"}, "date")
+    assert cursor.replace("-", "").replace("_", "").isalnum()
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_offset_cursor(3)])
+def test_bad_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_keyset_filter_breaks_ties_on_id():
+    cursor = encode_cursor({"_id": DOC_ID, "date": "2024-05-01"}, "date")
+    assert keyset_filter("date", -1, cursor) == {
+        "$or": [
+            {"date": {"$lt": "2024-05-01"}},
+            {"date": "2024-05-01", "_id": {"$lt": DOC_ID}},
+        ]
+    }
+    assert keyset_filter("date", 1, cursor)["$or"][0] == {"date": {"$gt": "2024-05-01"}}
+
+
+def test_offset_cursor_round_trip():
+    assert decode_offset_cursor(encode_offset_cursor(40)) == 40
+
+
+@pytest.mark.parametrize("cursor", ["junk", encode_cursor({"_id": DOC_ID, "date": 1}, "date")])
+def test_bad_offset_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_offset_cursor(cursor)
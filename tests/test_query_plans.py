@@ -0,0 +1,177 @@
+"""Check that every route query is served by an index from the manifest.
+
+The queries are built from the same declarations and helpers the routes
+use, so a new resource or sort order is checked without editing this file.
+Needs a real mongod (``MONGO_URL``, default localhost); skipped without one.
+"""
+import asyncio
+import os
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+
+import pytest
+from bson import ObjectId
+
+from inbox import inbox_filter
+from indexes import ensure_indexes
+from pagination import DEFAULT_PAGE_SIZE, encode_cursor, keyset_filter
+from resources import RESOURCES
+from search import SEARCH_SOURCES
+from sync import DEFAULT_SYNC_LIMIT, deleted_filter, sync_sort, written_filter
+
+
+class PlannedQuery(NamedTuple):
+    name: str
+    collection: str
+    filter: dict
+    sort: Optional[dict] = None
+    limit: int = 0
+    projection: Optional[dict] = None
+    # Text search ranks in memory by score; only the match must use an index
+    text: bool = False
+
+
+SINCE = datetime(2024, 1, 1)
+SAMPLE_ID = ObjectId("000000000000000000000000")
+
+
+def route_queries() -> List[PlannedQuery]:
+    queries = [PlannedQuery("login", "users", {"email": "admin@example.com"}, limit=1)]
+
+    for resource in RESOURCES:
+        name, sort_field, direction = resource.collection, resource.sort_field, resource.direction
+        if resource.paginated:
+            sort = {sort_field: direction, "_id": direction}
+            cursor = encode_cursor({"_id": SAMPLE_ID, sort_field: "2024-01-01"}, sort_field)
+            queries += [
+                PlannedQuery(f"{name} first page", name, {}, sort, DEFAULT_PAGE_SIZE + 1),
+                PlannedQuery(
+                    f"{name} next page", name, keyset_filter(sort_field, direction, cursor),
+                    sort, DEFAULT_PAGE_SIZE + 1,
+                ),
+            ]
+        else:
+            queries.append(PlannedQuery(f"{name} list", name, {}, {sort_field: direction}, 100))
+
+        timestamp = resource.timestamp_field
+        sync_limit = DEFAULT_SYNC_LIMIT + 1
+        written_cursor = encode_cursor({"_id": SAMPLE_ID, timestamp: SINCE}, timestamp)
+        deleted_cursor = encode_cursor({"_id": SAMPLE_ID, "deleted_at": SINCE}, "deleted_at")
+        queries += [
+            PlannedQuery(f"{name} watermark", name, {}, {timestamp: -1}, 1),
+            PlannedQuery(
+                f"{name} latest delete", "tombstones", {"collection": name}, {"deleted_at": -1}, 1
+            ),
+            PlannedQuery(
+                f"{name} full sync", name, written_filter(timestamp, None, None),
+                dict(sync_sort(timestamp)), sync_limit,
+            ),
+            PlannedQuery(
+                f"{name} sync", name, written_filter(timestamp, SINCE, None),
+                dict(sync_sort(timestamp)), sync_limit,
+            ),
+            PlannedQuery(
+                f"{name} sync next page", name, written_filter(timestamp, SINCE, written_cursor),
+                dict(sync_sort(timestamp)), sync_limit,
+            ),
+            PlannedQuery(
+                f"{name} sync deletes", "tombstones", deleted_filter(name, SINCE, None),
+                dict(sync_sort("deleted_at")), sync_limit,
+            ),
+            PlannedQuery(
+                f"{name} sync deletes next page", "tombstones", deleted_filter(name, SINCE, deleted_cursor),
+                dict(sync_sort("deleted_at")), sync_limit,
+            ),
+        ]
+
+    queries.append(PlannedQuery("settings watermark", "site_settings", {}, {"updated_at": -1}, 1))
+
+    for source in SEARCH_SOURCES:
+        queries.append(PlannedQuery(
+            f"{source.collection} search", source.collection,
+            {"$text": {"$search": "blood donation"}},
+            {"score": {"$meta": "textScore"}}, 21,
+            projection={"score": {"$meta": "textScore"}},
+            text=True,
+        ))
+
+    inbox_sort = {"created_at": -1, "_id": -1}
+    queries += [
+        PlannedQuery("inbox", "contact_submissions", inbox_filter(None, None, None), inbox_sort, 51),
+        PlannedQuery(
+            "inbox by status", "contact_submissions", inbox_filter("new", SINCE, None), inbox_sort, 51
+        ),
+    ]
+    return queries
+
+
+QUERIES = route_queries()
+
+
+def plan_stages(plan: dict):
+    """Yield every stage name in an explain ``winningPlan`` tree."""
+    if "stage" in plan:
+        yield plan["stage"]
+    # Slot-based engine plans nest the classic plan under queryPlan
+    for key in ("queryPlan", "inputStage"):
+        if isinstance(plan.get(key), dict):
+            yield from plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+
+async def explain_all():
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from pymongo.errors import PyMongoError
+
+    client = AsyncIOMotorClient(
+        os.environ.get("MONGO_URL", "mongodb://localhost:27017"), serverSelectionTimeoutMS=1000
+    )
+    db = client[os.environ.get("QUERY_PLAN_DB", "query_plan_check")]
+    try:
+        await client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        return None
+    try:
+        await client.drop_database(db.name)
+        # Creating the indexes also creates the collections, which explain()
+        # would otherwise report as an EOF plan
+        await ensure_indexes(db)
+        plans = {}
+        for query in QUERIES:
+            command = {"find": query.collection, "filter": query.filter}
+            if query.sort:
+                command["sort"] = query.sort
+            if query.limit:
+                command["limit"] = query.limit
+            if query.projection:
+                command["projection"] = query.projection
+            explained = await db.command("explain", command, verbosity="queryPlanner")
+            plans[query.name] = set(plan_stages(explained["queryPlanner"]["winningPlan"]))
+        return plans
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+
+
+@pytest.fixture(scope="module")
+def plans():
+    result = asyncio.run(explain_all())
+    if result is None:
+        pytest.skip("no mongod reachable at MONGO_URL")
+    return result
+
+
+def test_query_names_are_unique():
+    assert len({query.name for query in QUERIES}) == len(QUERIES)
+
+
+@pytest.mark.parametrize("query", QUERIES, ids=lambda query: query.name)
+def test_query_uses_an_index(plans, query):
+    stages = plans[query.name]
+    assert "COLLSCAN" not in stages
+    if query.text:
+        assert any(stage.startswith("TEXT") for stage in stages), stages
+    else:
+        assert "SORT" not in stages, stages
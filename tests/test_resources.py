@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from models import NewsArticleUpdate
+from projection import build_projection
+from resources import RESOURCES, changed_filter, update_fields
+
+
+ITEM_ID = ObjectId("65f000000000000000000001")
+STORED = {
+    "_id": ITEM_ID,
+    "title": "Blood drive",
+    "excerpt": "Short",
+    "images": ["a.jpg", "b.jpg"],
+    "updated_at": datetime(2024, 1, 1),
+}
+
+
+def test_update_fields_keeps_sent_fields_and_stamps_updated_at():
+    now = datetime(2024, 6, 1)
+    fields = update_fields(NewsArticleUpdate(title="New"), now)
+    assert fields == {"title": "New", "updated_at": now}
+
+
+def test_only_updated_at_needs_no_query():
+    assert changed_filter(ITEM_ID, {"updated_at": datetime.utcnow()}) is None
+
+
+def test_filter_ignores_updated_at():
+    query = changed_filter(ITEM_ID, {"title": "x", "updated_at": datetime.utcnow()})
+    assert query == {"_id": ITEM_ID, "$or": [{"title": {"$ne": "x"}}]}
+
+
+@pytest.mark.parametrize("fields, changes", [
+    ({"title": "Blood drive"}, False),
+    ({"title": "Blood drive", "excerpt": "Short"}, False),
+    ({"images": ["a.jpg", "b.jpg"]}, False),
+    ({"title": "Blood drive", "excerpt": "Longer"}, True),
+    ({"images": ["b.jpg", "a.jpg"]}, True),
+    ({"content": "Not stored yet"}, True),
+])
+def test_filter_matches_only_real_changes(fields, changes):
+    mongomock = pytest.importorskip("mongomock")
+    collection = mongomock.MongoClient().db.news
+    collection.insert_one(dict(STORED))
+    query = changed_filter(ITEM_ID, {**fields, "updated_at": datetime.utcnow()})
+    assert (collection.find_one(query) is not None) == changes
+
+
+@pytest.mark.parametrize("resource", RESOURCES, ids=lambda resource: resource.collection)
+def test_default_fields_are_known(resource):
+    # None keeps every field; anything else must be valid ``fields`` syntax
+    if resource.default_fields is not None:
+        assert build_projection(resource.default_fields, resource.model, required=(resource.sort_field,))
@@ -0,0 +1,19 @@
+from search import highlight
+
+
+def test_matches_are_marked():
+    assert highlight("Blood donation drive", ["donation"]) == "Blood <mark>donation</mark> drive"
+
+
+def test_text_is_escaped():
+    assert highlight("<b>Blood</b> drive", ["drive"]) == "&lt;b&gt;Blood&lt;/b&gt; <mark>drive</mark>"
+
+
+def test_terms_do_not_match_inside_entities():
+    text = 'Tom & Jerry said "hi" <3'
+    for term in ("amp", "quot", "lt", "gt"):
+        assert highlight(text, [term]) == 'Tom &amp; Jerry said &quot;hi&quot; &lt;3'
+
+
+def test_marked_match_is_escaped():
+    assert highlight("Q&A session", ["q"]) == "<mark>Q</mark>&amp;A session"
@@ -0,0 +1,72 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from models import GalleryImage, NewsArticle
+from sync import SyncSource, decode_sync_token, load_changes, record_deletes
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+SOURCES = (
+    SyncSource("news", NewsArticle, "updated_at"),
+    SyncSource("gallery", GalleryImage, "created_at"),
+)
+
+
+def news(i, when):
+    return {
+        "_id": ObjectId(), "title": f"News {i}", "date": "2024-01-01", "excerpt": "e",
+        "content": "c", "image": "i", "created_at": when, "updated_at": when,
+    }
+
+
+def sync_all(db, token, limit):
+    """Follow ``more`` to the last page; returns the pages."""
+    pages = []
+    while True:
+        page = asyncio.run(load_changes(db, SOURCES, token, limit))
+        pages.append(page)
+        token = page["token"]
+        if not page["more"]:
+            return pages
+
+
+@pytest.fixture
+def db():
+    database = mongomock_motor.AsyncMongoMockClient()["sync_test"]
+    now = datetime.utcnow()
+    # Several documents share a timestamp, so pages must break ties on _id
+    docs = [news(i, now - timedelta(minutes=i // 2)) for i in range(7)]
+    asyncio.run(database.news.insert_many(docs))
+    asyncio.run(database.gallery.insert_one({"url": "u", "caption": "c", "created_at": now}))
+    return database
+
+
+def test_full_copy_is_paged(db):
+    pages = sync_all(db, None, 3)
+    assert len(pages) == 3
+    assert [page["reset"] for page in pages] == [True, False, False]
+    ids = [doc.id for page in pages for doc in page["changes"]["news"]]
+    assert len(ids) == len(set(ids)) == 7
+    assert sum(len(page["changes"]["gallery"]) for page in pages) == 1
+    # The last page hands back an ordinary token
+    assert decode_sync_token(pages[-1]["token"]).started is None
+
+
+def test_deletes_are_paged(db):
+    token = sync_all(db, None, 100)[-1]["token"]
+    since = decode_sync_token(token).since
+    ids = [str(ObjectId()) for _ in range(5)]
+    asyncio.run(record_deletes(db, "news", ids))
+    asyncio.run(db.tombstones.update_many({}, {"$set": {"deleted_at": since + timedelta(seconds=10)}}))
+
+    pages = sync_all(db, token, 2)
+    assert not any(page["reset"] for page in pages)
+    assert [doc_id for page in pages for doc_id in page["deleted"]["news"]] == ids
+
+
+def test_bad_continuation_token_is_rejected(db):
+    with pytest.raises(ValueError):
+        asyncio.run(load_changes(db, SOURCES, "not-a-token", 10))
@@ -0,0 +1,112 @@
+import asyncio
+import hashlib
+import os
+import time
+
+import pytest
+
+from uploads import collect_garbage
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+DAY = 24 * 3600
+
+
+def digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()[:32]
+
+
+def upload(directory, content: bytes, name=None, age=2 * DAY):
+    """Write an upload ``age`` seconds old; content-addressed unless ``name`` is given."""
+    path = directory / (name or f"{digest(content)}.jpg")
+    path.write_bytes(content)
+    then = time.time() - age
+    os.utime(path, (then, then))
+    return path
+
+
+def variant(directory, content: bytes, width=640):
+    derived = directory / ".derived"
+    derived.mkdir(exist_ok=True)
+    path = derived / f"{digest(content)}-{width}.webp"
+    path.write_bytes(b"webp")
+    return path
+
+
+@pytest.fixture
+def db():
+    return mongomock_motor.AsyncMongoMockClient()["uploads_test"]
+
+
+def refer(db, *paths):
+    urls = [f"https://example.org/uploads/{path.name}" for path in paths]
+    asyncio.run(db.past_events.insert_one({"title": "Event", "images": urls}))
+
+
+def collect(db, directory, grace=DAY, dry_run=False):
+    return set(asyncio.run(collect_garbage(db, directory, grace, dry_run)))
+
+
+def test_referenced_files_are_kept_and_orphans_removed(db, tmp_path):
+    kept = upload(tmp_path, b"kept")
+    orphan = upload(tmp_path, b"orphan")
+    refer(db, kept)
+
+    assert collect(db, tmp_path) == {orphan}
+    assert kept.exists() and not orphan.exists()
+
+
+def test_references_in_every_collection_count(db, tmp_path):
+    files = [upload(tmp_path, name.encode()) for name in ("gallery", "news", "member")]
+    asyncio.run(db.gallery.insert_one({"url": f"/uploads/{files[0].name}"}))
+    asyncio.run(db.news.insert_one({"image": f"https://example.org/uploads/{files[1].name}?w=640"}))
+    asyncio.run(db.board_members.insert_one({"image": f"/uploads/{files[2].name}"}))
+
+    assert collect(db, tmp_path) == set()
+
+
+def test_orphans_within_the_grace_period_are_kept(db, tmp_path):
+    fresh = upload(tmp_path, b"just uploaded", age=60)
+    stale = upload(tmp_path, b"long forgotten")
+
+    assert collect(db, tmp_path) == {stale}
+    assert fresh.exists()
+
+
+def test_legacy_names_are_matched_by_content(db, tmp_path):
+    legacy = upload(tmp_path, b"legacy kept", name="5f1e0c4e-8d2b-4f7a-9c3e-1a2b3c4d5e6f.jpg")
+    legacy_orphan = upload(tmp_path, b"legacy orphan", name="0b7c2d9a-3e4f-4a5b-8c6d-7e8f9a0b1c2d.png")
+    kept_variant = variant(tmp_path, b"legacy kept")
+    orphan_variant = variant(tmp_path, b"legacy orphan")
+    refer(db, legacy)
+
+    assert collect(db, tmp_path) == {legacy_orphan, orphan_variant}
+    assert legacy.exists() and kept_variant.exists()
+
+
+def test_variants_are_removed_only_with_their_source(db, tmp_path):
+    kept = upload(tmp_path, b"kept")
+    orphan = upload(tmp_path, b"orphan")
+    fresh = upload(tmp_path, b"fresh", age=60)
+    refer(db, kept)
+    kept_variants = [variant(tmp_path, b"kept", width) for width in (320, 640)]
+    fresh_variant = variant(tmp_path, b"fresh")
+    orphan_variants = {variant(tmp_path, b"orphan", width) for width in (320, 640)}
+
+    assert collect(db, tmp_path) == {orphan} | orphan_variants
+    assert all(path.exists() for path in kept_variants + [fresh_variant, fresh])
+
+
+def test_dry_run_deletes_nothing(db, tmp_path):
+    orphan = upload(tmp_path, b"orphan")
+    orphan_variant = variant(tmp_path, b"orphan")
+
+    assert collect(db, tmp_path, dry_run=True) == {orphan, orphan_variant}
+    assert orphan.exists() and orphan_variant.exists()
+
+
+def test_hidden_files_are_left_alone(db, tmp_path):
+    partial = upload(tmp_path, b"partial", name=".upload-abc.part")
+
+    assert collect(db, tmp_path) == set()
+    assert partial.exists()
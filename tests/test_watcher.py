@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+import watcher
+from watcher import ContentWatcher, describe_change
+
+
+DOC_ID = ObjectId()
+
+
+def event(operation, coll="news", **extra):
+    return {"operationType": operation, "ns": {"db": "test", "coll": coll}, **extra}
+
+
+def test_insert_carries_the_document():
+    change = event("insert", documentKey={"_id": DOC_ID}, fullDocument={"_id": DOC_ID, "title": "T"})
+    assert describe_change(change) == ("create", str(DOC_ID), {"_id": DOC_ID, "title": "T"})
+
+
+def test_update_carries_the_updated_fields():
+    change = event(
+        "update", documentKey={"_id": DOC_ID},
+        updateDescription={"updatedFields": {"title": "New"}, "removedFields": []},
+    )
+    assert describe_change(change) == ("update", str(DOC_ID), {"title": "New"})
+
+
+def test_delete_has_no_fields():
+    assert describe_change(event("delete", documentKey={"_id": DOC_ID})) == ("delete", str(DOC_ID), None)
+
+
+def test_collection_events_are_not_document_changes():
+    for operation in ("drop", "rename", "dropDatabase", "invalidate"):
+        assert describe_change(event(operation)) is None
+
+
+class FakeStream:
+    def __init__(self, changes):
+        self.changes = changes
+        self.resume_token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def __aiter__(self):
+        for change in self.changes:
+            self.resume_token = {"_data": str(id(change))}
+            yield change
+
+
+class FakeDatabase:
+    def __init__(self, changes):
+        self.changes = changes
+
+    def watch(self, pipeline, resume_after=None):
+        changes, self.changes = self.changes, []
+        return FakeStream(changes)
+
+
+def test_watch_reports_each_change():
+    received = []
+    db = FakeDatabase([
+        event("insert", documentKey={"_id": DOC_ID}, fullDocument={"_id": DOC_ID}),
+        event("delete", "gallery", documentKey={"_id": DOC_ID}),
+        event("drop", "gallery"),
+    ])
+    watcher = ContentWatcher(db, {"news": "updated_at", "gallery": "created_at"},
+                             lambda collection, change: received.append((collection, change)))
+
+    async def run():
+        task = asyncio.create_task(watcher._watch())
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(run())
+    assert received == [
+        ("news", ("create", str(DOC_ID), {"_id": DOC_ID})),
+        ("gallery", ("delete", str(DOC_ID), None)),
+        ("news", None),
+        ("gallery", None),
+    ]
+    assert watcher.mode == "watch"
+
+
+def test_polling_skips_changes_this_worker_published(monkeypatch):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    monkeypatch.setattr(watcher, "POLL_INTERVAL", 0.01)
+    db = mongomock_motor.AsyncMongoMockClient()["watcher_test"]
+    received = []
+    content = ContentWatcher(db, {"news": "updated_at"}, lambda collection, change: received.append(collection))
+
+    async def run():
+        task = asyncio.create_task(content._poll())
+        await asyncio.sleep(0.05)
+        # Written and published by this worker
+        now = datetime.utcnow()
+        result = await db.news.insert_one({"title": "Mine", "updated_at": now})
+        content.published("news", [("create", str(result.inserted_id), {"updated_at": now})])
+        await asyncio.sleep(0.05)
+        assert received == []
+        # Written by another worker
+        await db.news.insert_one({"title": "Theirs", "updated_at": datetime.utcnow()})
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(run())
+    assert received == ["news"]